@@ -0,0 +1,142 @@
+"""
+Benchmark the AUTO thinking-mode complexity classifier
+
+Compares the original substring scan over the whole history against the
+incremental scorer in bot.complexity, on a seeded synthetic corpus of
+channel conversations. Reports time per request and the fraction of
+requests routed into thinking mode.
+
+    python -m benchmarks.bench_complexity --conversations 200 --turns 30
+"""
+
+import argparse
+import json
+import random
+import time
+from typing import Dict, List
+
+from bot.complexity import conversation_score, is_complex, message_features, score_messages
+
+CASUAL = [
+    "hey everyone",
+    "lol that's great",
+    "how are you doing today",
+    "good morning",
+    "what's up",
+    "show me your favourite song",
+    "thanks!",
+    "howdy partner",
+    "nice one",
+    "anyone playing tonight?",
+]
+
+HARD = [
+    "Can you explain how TCP congestion control works?",
+    "Compare Rust and Go for writing a web server",
+    "Help me debug this:\n```python\nprint(x[0])\n```",
+    "Solve x^2 - 5x + 6 = 0 step by step",
+    "Why does the design of this architecture scale badly?",
+]
+
+
+def legacy_is_complex(messages: List[Dict[str, str]]) -> bool:
+    """The original classifier: substring scan over the joined history"""
+    complexity_indicators = [
+        "explain", "analyze", "compare", "contrast", "research",
+        "solve", "calculate", "debug", "design", "architecture",
+        "why", "how", "complex", "complicated"
+    ]
+
+    full_text = " ".join([m.get("content", "").lower() for m in messages])
+    return any(indicator in full_text for indicator in complexity_indicators)
+
+
+def build_corpus(conversations: int, turns: int, hard_ratio: float, seed: int) -> List[List[str]]:
+    rng = random.Random(seed)
+    return [
+        [
+            rng.choice(HARD) if rng.random() < hard_ratio else rng.choice(CASUAL)
+            for _ in range(turns)
+        ]
+        for _ in range(conversations)
+    ]
+
+
+def run_legacy(corpus: List[List[str]]) -> Dict[str, float]:
+    routed = requests = 0
+    start = time.perf_counter()
+    for conversation in corpus:
+        history: List[Dict[str, str]] = []
+        for content in conversation:
+            history.append({"role": "user", "content": content})
+            routed += legacy_is_complex(history)
+            requests += 1
+    elapsed = time.perf_counter() - start
+    return {"requests": requests, "routed": routed, "elapsed": elapsed}
+
+
+def run_incremental(corpus: List[List[str]]) -> Dict[str, float]:
+    """Features are computed once per message, as ChatManager does on insert"""
+    routed = requests = 0
+    start = time.perf_counter()
+    for conversation in corpus:
+        features: List[float] = []
+        for content in conversation:
+            features.append(message_features(content))
+            routed += is_complex(conversation_score(reversed(features)))
+            requests += 1
+    elapsed = time.perf_counter() - start
+    return {"requests": requests, "routed": routed, "elapsed": elapsed}
+
+
+def run_uncached(corpus: List[List[str]]) -> Dict[str, float]:
+    """The fallback path used when no cached score is passed to the client"""
+    routed = requests = 0
+    start = time.perf_counter()
+    for conversation in corpus:
+        history: List[Dict[str, str]] = []
+        for content in conversation:
+            history.append({"role": "user", "content": content})
+            routed += is_complex(score_messages(history))
+            requests += 1
+    elapsed = time.perf_counter() - start
+    return {"requests": requests, "routed": routed, "elapsed": elapsed}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--conversations", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=30)
+    parser.add_argument("--hard-ratio", type=float, default=0.15,
+                        help="Fraction of turns that genuinely need reasoning")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.conversations, args.turns, args.hard_ratio, args.seed)
+    report = {}
+    for name, runner in (
+        ("legacy", run_legacy),
+        ("incremental", run_incremental),
+        ("uncached", run_uncached),
+    ):
+        result = runner(corpus)
+        report[name] = {
+            "requests": result["requests"],
+            "us_per_request": result["elapsed"] / result["requests"] * 1e6,
+            "thinking_fraction": result["routed"] / result["requests"],
+        }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    for name, row in report.items():
+        print(
+            f"{name:12} {row['us_per_request']:8.2f} us/request  "
+            f"thinking {row['thinking_fraction'] * 100:5.1f}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,504 @@
+"""
+Offline Discord gateway simulator for end-to-end on_message benchmarks
+
+Feeds synthetic messages (guild chat channels, DMs, mentions, replies to the
+bot, prefixed commands and ignored chatter) through a real DiscordBot
+instance: on_message -> process_commands -> _should_respond_to_message ->
+_handle_chat_message -> _safe_send, plus cog on_message listeners. Nothing
+talks to Discord: channels and messages are discord.py subclasses whose
+send/typing/reactions only count what would have gone out, and the Sarvam
+upstream is an in-process fake (or the mock server via --url).
+
+    python -m benchmarks.gateway_sim --messages 20000
+    python -m benchmarks.gateway_sim --messages 1000000 --tracemalloc --sample-every 50000
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import os
+import random
+import resource
+import time
+import tracemalloc
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import discord
+from discord.ext import commands
+
+from bot.metrics import LatencyHistogram
+
+BOT_USER_ID = 100_000_000_000_000_001
+DISCORD_EPOCH_MS = 1_420_070_400_000
+
+
+def _snowflake(sequence: int) -> int:
+    return ((int(time.time() * 1000) - DISCORD_EPOCH_MS) << 22) | (sequence & 0x3FFFFF)
+
+
+class Sink:
+    """Counts what the bot would have sent to Discord"""
+
+    def __init__(self):
+        self.sends = 0
+        self.edits = 0
+        self.files = 0
+        self.reactions = 0
+        self.chars = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return dict(vars(self))
+
+
+class _Typing:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeUser:
+    """Minimal user/member: what the handlers and commands read"""
+
+    __slots__ = ("id", "name", "bot", "guild_permissions")
+
+    def __init__(self, user_id: int, name: str, bot: bool = False):
+        self.id = user_id
+        self.name = name
+        self.bot = bot
+        self.guild_permissions = discord.Permissions.none()
+
+    @property
+    def mention(self) -> str:
+        return f"<@{self.id}>"
+
+    @property
+    def display_name(self) -> str:
+        return self.name
+
+    def __eq__(self, other: Any) -> bool:
+        return getattr(other, "id", None) == self.id
+
+    def __hash__(self) -> int:
+        return hash(self.id)
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class FakeGuild:
+    __slots__ = ("id", "name", "member_count")
+
+    def __init__(self, guild_id: int):
+        self.id = guild_id
+        self.name = f"guild-{guild_id}"
+        self.member_count = 100
+
+
+class FakeSentMessage:
+    """What channel.send returns; streaming replies edit it"""
+
+    __slots__ = ("channel", "id")
+
+    def __init__(self, channel, message_id: int):
+        self.channel = channel
+        self.id = message_id
+
+    async def edit(self, content: Optional[str] = None, **kwargs) -> "FakeSentMessage":
+        self.channel.sink.edits += 1
+        self.channel.sink.chars += len(content or "")
+        return self
+
+
+class _FakeMessageable:
+    """send/typing overrides shared by the fake channel types"""
+
+    async def send(self, content: Optional[str] = None, **kwargs) -> FakeSentMessage:
+        self.sink.sends += 1
+        self.sink.chars += len(content or "")
+        if kwargs.get("file") is not None:
+            self.sink.files += 1
+        return FakeSentMessage(self, self.sink.sends)
+
+    def typing(self) -> _Typing:
+        return _Typing()
+
+    async def fetch_message(self, message_id: int):
+        raise discord.DiscordException("Simulated channels keep no message history")
+
+
+class FakeTextChannel(_FakeMessageable, discord.TextChannel):
+    """Guild text channel; discord.TextChannel.__init__ is deliberately not called"""
+
+    def __init__(self, channel_id: int, guild: FakeGuild, sink: Sink):
+        self.id = channel_id
+        self.guild = guild
+        self.name = f"chat-{channel_id}"
+        self.sink = sink
+
+
+class FakeDMChannel(_FakeMessageable, discord.DMChannel):
+    """Direct message channel; discord.DMChannel.__init__ is deliberately not called"""
+
+    def __init__(self, channel_id: int, recipient: FakeUser, sink: Sink):
+        self.id = channel_id
+        self.recipients = [recipient]
+        self.me = None
+        self.sink = sink
+
+    def __str__(self) -> str:
+        return f"Direct Message with {self.recipients[0]}"
+
+
+class FakeReference:
+    __slots__ = ("message_id", "resolved")
+
+    def __init__(self, resolved):
+        self.message_id = resolved.id
+        self.resolved = resolved
+
+
+class FakeMessage(discord.Message):
+    """Incoming message; discord.Message.__init__ is deliberately not called"""
+
+    def __init__(
+        self,
+        state,
+        message_id: int,
+        content: str,
+        author: FakeUser,
+        channel,
+        guild: Optional[FakeGuild],
+        mentions: List[FakeUser],
+        reference: Optional[FakeReference] = None,
+    ):
+        self._state = state
+        self.id = message_id
+        self.content = content
+        self.author = author
+        self.channel = channel
+        self.guild = guild
+        self.mentions = mentions
+        self.reference = reference
+        self.attachments = []
+        self.embeds = []
+
+    async def add_reaction(self, emoji) -> None:
+        self.channel.sink.reactions += 1
+
+
+class FakeGateway:
+    """Stands in for the websocket so bot.latency reads a heartbeat value"""
+
+    open = False
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def close(self, code: int = 1000) -> None:
+        pass
+
+
+class FakeTransport:
+    """In-process stand-in for SarvamHTTPTransport with a fixed answer latency"""
+
+    def __init__(self, latency: float, reply_chars: int):
+        self.latency = latency
+        self.reply = ("lorem ipsum dolor sit amet " * (reply_chars // 27 + 1))[:reply_chars]
+
+    async def chat_completions(self, **params: Any) -> Dict[str, Any]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return {"choices": [{"message": {"role": "assistant", "content": self.reply}}]}
+
+    async def stream_chat_completions(self, **params: Any) -> AsyncIterator[str]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        for start in range(0, len(self.reply), 64):
+            yield self.reply[start:start + 64]
+
+    async def close(self) -> None:
+        pass
+
+
+def _patch_context() -> None:
+    """Route Context.send/typing to the fake channel instead of the Discord HTTP API"""
+    async def send(self, content=None, **kwargs):
+        return await self.channel.send(content, **kwargs)
+
+    def typing(self, *, ephemeral: bool = False):
+        return self.channel.typing()
+
+    commands.Context.send = send
+    commands.Context.typing = typing
+
+
+MESSAGE_KINDS = {
+    "chat_guild": 0.40,
+    "chat_dm": 0.10,
+    "mention": 0.10,
+    "reply": 0.05,
+    "ignored": 0.15,
+    "command": 0.20,
+}
+
+COMMANDS = ["ping", "roll 20", "flip", "stats", "help", "ask what is a monad", "explain recursion"]
+
+CHAT_LINES = [
+    "hey, how's it going?",
+    "can you explain how a hash map works",
+    "lol nice",
+    "what should I cook tonight",
+    "compare python and javascript for a beginner",
+    "why is the sky blue",
+    "tell me a fun fact",
+]
+
+
+class GatewaySimulator:
+    """Generates messages and feeds them to a DiscordBot, timing each one"""
+
+    def __init__(self, bot, args: argparse.Namespace):
+        self.bot = bot
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.sink = Sink()
+        self.sequence = 0
+        self.prefix = bot.config.command_prefix
+        self.guilds = [FakeGuild(10_000 + i) for i in range(args.guilds)]
+        self.chat_channels = [
+            FakeTextChannel(20_000 + i, self.guilds[i % args.guilds], self.sink)
+            for i in range(args.channels)
+        ]
+        self.quiet_channels = [
+            FakeTextChannel(30_000 + i, self.guilds[i % args.guilds], self.sink)
+            for i in range(args.channels)
+        ]
+        self.users = [FakeUser(40_000 + i, f"user{i}") for i in range(args.users)]
+        self.dm_channels: Dict[int, FakeDMChannel] = {}
+        self.kinds = list(MESSAGE_KINDS)
+        self.weights = [MESSAGE_KINDS[kind] for kind in self.kinds]
+        self.latency: Dict[str, LatencyHistogram] = {}
+        self.listeners = list(bot.extra_events.get("on_message", []))
+
+    def _next_id(self) -> int:
+        self.sequence += 1
+        return _snowflake(self.sequence)
+
+    def make_message(self):
+        """Returns (label, message) for one synthetic message"""
+        kind = self.rng.choices(self.kinds, self.weights)[0]
+        author = self.rng.choice(self.users)
+        state = self.bot._connection
+        me = self.bot.user
+
+        if kind == "chat_dm":
+            channel = self.dm_channels.get(author.id)
+            if channel is None:
+                channel = self.dm_channels[author.id] = FakeDMChannel(50_000 + author.id, author, self.sink)
+            return kind, FakeMessage(
+                state, self._next_id(), self.rng.choice(CHAT_LINES), author, channel, None, []
+            )
+
+        if kind == "command":
+            command = self.rng.choice(COMMANDS)
+            channel = self.rng.choice(self.quiet_channels)
+            label = f"command:{command.split()[0]}"
+            return label, FakeMessage(
+                state, self._next_id(), f"{self.prefix}{command}", author, channel, channel.guild, []
+            )
+
+        if kind in ("mention", "ignored"):
+            channel = self.rng.choice(self.quiet_channels)
+            mentions = [me] if kind == "mention" else []
+            content = self.rng.choice(CHAT_LINES)
+            if kind == "mention":
+                content = f"{me.mention} {content}"
+            return kind, FakeMessage(
+                state, self._next_id(), content, author, channel, channel.guild, mentions
+            )
+
+        channel = self.rng.choice(self.chat_channels)
+        reference = None
+        mentions = []
+        if kind == "reply":
+            previous = FakeMessage(state, self._next_id(), "earlier answer", me, channel, channel.guild, [])
+            reference = FakeReference(previous)
+            mentions = [me]
+        return kind, FakeMessage(
+            state, self._next_id(), self.rng.choice(CHAT_LINES), author, channel, channel.guild,
+            mentions, reference,
+        )
+
+    async def deliver(self, message) -> None:
+        """What the gateway's MESSAGE_CREATE dispatch would run, awaited"""
+        await asyncio.gather(
+            self.bot.on_message(message),
+            *(listener(message) for listener in self.listeners),
+        )
+
+    async def run(self) -> Dict[str, Any]:
+        args = self.args
+        samples: List[Dict[str, Any]] = []
+        first_snapshot = None
+        if args.tracemalloc:
+            tracemalloc.start(args.trace_frames)
+
+        semaphore = asyncio.Semaphore(args.concurrency)
+        pending = set()
+
+        async def one(label: str, message) -> None:
+            async with semaphore:
+                started = time.perf_counter()
+                await self.deliver(message)
+                histogram = self.latency.get(label)
+                if histogram is None:
+                    histogram = self.latency[label] = LatencyHistogram()
+                histogram.record(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        for index in range(1, args.messages + 1):
+            label, message = self.make_message()
+            if args.concurrency == 1:
+                await one(label, message)
+            else:
+                await semaphore.acquire()
+                semaphore.release()
+                task = asyncio.ensure_future(one(label, message))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+
+            if index % args.sample_every == 0 or index == args.messages:
+                if pending:
+                    await asyncio.gather(*pending)
+                sample = {
+                    "messages": index,
+                    "elapsed_s": round(time.perf_counter() - started, 3),
+                    "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                    "history": self.bot.chat_manager.get_stats(),
+                }
+                if args.tracemalloc:
+                    gc.collect()
+                    current, peak = tracemalloc.get_traced_memory()
+                    sample["traced_bytes"] = current
+                    sample["traced_peak_bytes"] = peak
+                    if first_snapshot is None:
+                        first_snapshot = tracemalloc.take_snapshot()
+                samples.append(sample)
+
+        if pending:
+            await asyncio.gather(*pending)
+        elapsed = time.perf_counter() - started
+
+        top_growth = []
+        if args.tracemalloc:
+            if first_snapshot is not None:
+                diff = tracemalloc.take_snapshot().compare_to(first_snapshot, "lineno")
+                top_growth = [
+                    {"where": str(stat.traceback), "size_diff": stat.size_diff, "count_diff": stat.count_diff}
+                    for stat in diff[:args.top]
+                ]
+            tracemalloc.stop()
+
+        return {
+            "messages": args.messages,
+            "elapsed_s": round(elapsed, 3),
+            "messages_per_s": round(args.messages / elapsed, 1) if elapsed else 0.0,
+            "latency_by_kind": {
+                label: histogram.summary((50.0, 90.0, 99.0))
+                for label, histogram in sorted(self.latency.items())
+            },
+            "sent": self.sink.to_dict(),
+            "memory_samples": samples,
+            "memory_top_growth": top_growth,
+        }
+
+
+def configure_environment(args: argparse.Namespace) -> None:
+    os.environ.update({
+        "SARVAM_API_KEY": os.environ.get("SARVAM_API_KEY", "benchmark"),
+        "SARVAM_TRANSPORT": "http",
+        "SARVAM_BASE_URL": args.url or "http://127.0.0.1:9/unused",
+        "STREAM_RESPONSES": "true" if args.stream else "false",
+        "DISK_CACHE_PATH": "",
+        "HISTORY_DB_PATH": "",
+        "METRICS_PORT": "0",
+        "ENABLE_AUTO_REACTIONS": "true",
+        "RATE_LIMIT_REQUESTS": "0",
+        "RATE_LIMIT_GUILD_REQUESTS": "0",
+        "RATE_LIMIT_GLOBAL_REQUESTS": "0",
+    })
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    configure_environment(args)
+
+    # Imported late so BotConfig sees the environment set above
+    from bot import discord_client
+    from bot.config import BotConfig
+    from bot.sarvam_client import SarvamClient
+
+    _patch_context()
+    config = BotConfig()
+    client = SarvamClient(config)
+    if not args.url:
+        client.http_transport = FakeTransport(args.upstream_ms / 1000, args.reply_chars)
+
+    bot = discord_client.DiscordBot(config, client)
+    await bot._async_setup_hook()
+    bot._connection.user = FakeUser(BOT_USER_ID, "sarvam-bot", bot=True)
+    bot.ws = FakeGateway(0.042)
+    await bot.setup_hook()
+
+    simulator = GatewaySimulator(bot, args)
+    # Enable AI chat in the simulated chat channels without touching the JSON store on disk
+    saved_channels = discord_client.channel_memory.data
+    discord_client.channel_memory.data = {
+        f"sim-{channel.id}": channel.id for channel in simulator.chat_channels
+    }
+    try:
+        report = await simulator.run()
+    finally:
+        discord_client.channel_memory.data = saved_channels
+        await bot.close()
+    report["client"] = {
+        key: value for key, value in client.get_stats().items()
+        if key in ("total_requests", "cache_hits", "cache_misses", "coalesced_requests", "errors")
+    }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline Discord gateway simulator")
+    parser.add_argument("--messages", type=int, default=10_000)
+    parser.add_argument("--concurrency", type=int, default=1, help="Messages handled at once")
+    parser.add_argument("--guilds", type=int, default=20)
+    parser.add_argument("--channels", type=int, default=50, help="AI chat channels (and as many quiet ones)")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--upstream-ms", type=float, default=0.0, help="Fake Sarvam latency")
+    parser.add_argument("--reply-chars", type=int, default=600)
+    parser.add_argument("--url", help="Use a running mock server instead of the in-process fake")
+    parser.add_argument("--stream", action="store_true")
+    parser.add_argument("--tracemalloc", action="store_true", help="Track Python allocations (slow)")
+    parser.add_argument("--trace-frames", type=int, default=1)
+    parser.add_argument("--sample-every", type=int, default=5_000)
+    parser.add_argument("--top", type=int, default=10, help="Allocation sites to report")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    report = asyncio.run(run(args))
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload)
+    else:
+        print(payload)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""
+Load generator for SarvamClient.generate_response
+
+Drives the real client (cache, scheduler, limiter, retries) against the mock
+Sarvam server and prints a JSON report with throughput, latency
+percentiles, cache hit rate and error rate.
+
+    python -m benchmarks.loadgen --requests 2000 --concurrency 50
+    python -m benchmarks.loadgen --arrival poisson --rate 40 --duration 30 --error-rate 0.05
+    python -m benchmarks.loadgen --url http://127.0.0.1:8600/v1/chat/completions --stream
+
+Without --url an in-process mock server is started using the mock flags.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+from benchmarks.mock_sarvam_server import MockSarvamServer, add_mock_arguments, options_from_args
+from bot.metrics import LatencyHistogram
+
+FAILURE_PREFIXES = ("Sorry,", "⚠️", "⏳")
+
+TOPICS = [
+    "python decorators", "rust lifetimes", "photosynthesis", "the french revolution",
+    "black holes", "sql indexes", "binary search", "climate change", "jazz history",
+    "tcp handshakes", "neural networks", "the roman empire", "compound interest",
+]
+TEMPLATES = [
+    "Tell me something fun about {topic}",
+    "Explain {topic} step by step",
+    "Give me a one line summary of {topic}",
+    "Why is {topic} important?",
+    "hey, what do you think about {topic}",
+]
+
+
+def build_prompts(unique: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    prompts = [
+        f"{rng.choice(TEMPLATES).format(topic=rng.choice(TOPICS))} (#{index})"
+        for index in range(unique)
+    ]
+    return prompts
+
+
+class PromptPicker:
+    """Zipf-distributed prompt choice: a few hot prompts repeat, most are rare"""
+
+    def __init__(self, prompts: List[str], skew: float, seed: int):
+        self.prompts = prompts
+        self.rng = random.Random(seed)
+        weights = [1 / (rank + 1) ** skew for rank in range(len(prompts))]
+        self.cumulative = list(itertools.accumulate(weights))
+
+    def pick(self) -> str:
+        return self.rng.choices(self.prompts, cum_weights=self.cumulative)[0]
+
+
+def configure_environment(args: argparse.Namespace, url: str) -> None:
+    """Point BotConfig at the target server and switch off what the run should not measure"""
+    os.environ.update({
+        "SARVAM_API_KEY": os.environ.get("SARVAM_API_KEY", "benchmark"),
+        "SARVAM_TRANSPORT": "http",
+        "SARVAM_BASE_URL": url,
+        "STREAM_RESPONSES": "true" if args.stream else "false",
+        "DISK_CACHE_PATH": "",
+        "HEDGE_ENABLED": "true" if args.hedge else "false",
+    })
+    if not args.rate_limits:
+        os.environ.update({
+            "RATE_LIMIT_REQUESTS": "0",
+            "RATE_LIMIT_GUILD_REQUESTS": "0",
+            "RATE_LIMIT_GLOBAL_REQUESTS": "0",
+        })
+
+
+class LoadRun:
+    """Issues requests and collects per-request outcomes"""
+
+    def __init__(self, client, args: argparse.Namespace):
+        self.client = client
+        self.args = args
+        self.picker = PromptPicker(
+            build_prompts(args.unique_prompts, args.seed), args.zipf_skew, args.seed
+        )
+        self.rng = random.Random(args.seed + 1)
+        self.latency = LatencyHistogram()
+        self.ttft = LatencyHistogram()
+        self.outcomes: Dict[str, int] = {"ok": 0, "failed": 0, "exceptions": 0}
+        self.sent = 0
+
+    async def one_request(self) -> None:
+        messages = [{"role": "user", "content": self.picker.pick()}]
+        requester = {
+            "guild_id": self.rng.randrange(self.args.guilds) if self.args.guilds else None,
+            "user_id": self.rng.randrange(self.args.users),
+        }
+        self.sent += 1
+        started = time.perf_counter()
+        try:
+            if self.args.stream:
+                parts = []
+                async for fragment in self.client.stream_response(messages, **requester):
+                    if not parts:
+                        self.ttft.record(time.perf_counter() - started)
+                    parts.append(fragment)
+                response = "".join(parts)
+            else:
+                response = await self.client.generate_response(messages, **requester)
+        except Exception:
+            self.outcomes["exceptions"] += 1
+            return
+        self.latency.record(time.perf_counter() - started)
+        if response and not response.startswith(FAILURE_PREFIXES):
+            self.outcomes["ok"] += 1
+        else:
+            self.outcomes["failed"] += 1
+
+    def _more(self, deadline: float) -> bool:
+        if self.args.requests and self.sent >= self.args.requests:
+            return False
+        return time.monotonic() < deadline
+
+    async def run_closed(self, deadline: float) -> None:
+        """Fixed number of workers, each sending its next request as soon as the last returns"""
+        async def worker():
+            while self._more(deadline):
+                await self.one_request()
+        await asyncio.gather(*(worker() for _ in range(self.args.concurrency)))
+
+    async def run_open(self, deadline: float) -> None:
+        """Requests arrive on a schedule regardless of how fast they complete"""
+        tasks = set()
+        while self._more(deadline):
+            if self.args.arrival == "poisson":
+                batch, gap = 1, self.rng.expovariate(self.args.rate)
+            else:
+                batch, gap = self.args.burst_size, self.args.burst_interval
+            for _ in range(batch):
+                if not self._more(deadline):
+                    break
+                task = asyncio.ensure_future(self.one_request())
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            await asyncio.sleep(gap)
+        if tasks:
+            await asyncio.gather(*tasks)
+
+
+def _histogram_report(histogram: LatencyHistogram) -> Dict[str, Any]:
+    report = {"count": histogram.count}
+    if histogram.count:
+        report.update({
+            "mean_ms": round(histogram.mean * 1000, 2),
+            **{f"p{p:g}_ms": round(histogram.percentile(p) * 1000, 2) for p in (50, 90, 99, 99.9)},
+            "max_ms": round(histogram.max_us / 1000, 2),
+        })
+    return report
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    server: Optional[MockSarvamServer] = None
+    url = args.url
+    if not url:
+        server = MockSarvamServer(options_from_args(args))
+        url = await server.start("127.0.0.1", 0)
+    configure_environment(args, url)
+
+    # Imported late so BotConfig sees the environment set above
+    from bot.config import BotConfig
+    from bot.sarvam_client import SarvamClient, ThinkingMode
+
+    client = SarvamClient(BotConfig())
+    client.set_thinking_mode(ThinkingMode(args.thinking_mode))
+    await client.start()
+    load = LoadRun(client, args)
+    deadline = time.monotonic() + (args.duration or float("inf"))
+    started = time.perf_counter()
+    try:
+        if args.arrival == "closed":
+            await load.run_closed(deadline)
+        else:
+            await load.run_open(deadline)
+    finally:
+        elapsed = time.perf_counter() - started
+        stats = client.get_stats()
+        await client.close()
+        if server is not None:
+            await server.stop()
+
+    completed = load.latency.count
+    lookups = stats["cache_hits"] + stats["cache_misses"]
+    report = {
+        "config": {
+            key: value for key, value in vars(args).items() if key not in ("output",)
+        },
+        "elapsed_s": round(elapsed, 3),
+        "requests": load.sent,
+        "completed": completed,
+        "throughput_rps": round(completed / elapsed, 2) if elapsed else 0.0,
+        "outcomes": load.outcomes,
+        "error_rate": round((load.outcomes["failed"] + load.outcomes["exceptions"]) / load.sent, 4)
+        if load.sent else 0.0,
+        "cache_hit_rate": round(stats["cache_hits"] / lookups, 4) if lookups else 0.0,
+        "latency": _histogram_report(load.latency),
+        "client": {
+            key: stats[key] for key in (
+                "total_requests", "errors", "retries", "retries_skipped_budget",
+                "non_retryable_errors", "circuit_fast_fails", "rate_limited",
+                "deadline_dropped", "coalesced_requests", "auto_thinking",
+                "hedges_sent", "hedge_wins", "limiter_limit", "circuit_state",
+            ) if key in stats
+        },
+    }
+    if args.stream:
+        report["time_to_first_token"] = _histogram_report(load.ttft)
+    if server is not None:
+        report["upstream"] = dict(server.stats)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load generator for SarvamClient")
+    parser.add_argument("--url", help="Completions URL of a running server (default: in-process mock)")
+    parser.add_argument("--requests", type=int, default=1000, help="Stop after this many requests (0 = no limit)")
+    parser.add_argument("--duration", type=float, default=0, help="Stop after this many seconds (0 = no limit)")
+    parser.add_argument("--arrival", choices=["closed", "poisson", "burst"], default="closed")
+    parser.add_argument("--concurrency", type=int, default=20, help="Workers for closed-loop arrival")
+    parser.add_argument("--rate", type=float, default=20.0, help="Mean requests/s for poisson arrival")
+    parser.add_argument("--burst-size", type=int, default=50)
+    parser.add_argument("--burst-interval", type=float, default=5.0)
+    parser.add_argument("--unique-prompts", type=int, default=500)
+    parser.add_argument("--zipf-skew", type=float, default=1.1, help="0 = uniform prompt choice")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--guilds", type=int, default=20)
+    parser.add_argument("--thinking-mode", choices=["disabled", "enabled", "auto"], default="auto")
+    parser.add_argument("--stream", action="store_true", help="Use stream_response instead")
+    parser.add_argument("--hedge", action="store_true", help="Enable hedged requests")
+    parser.add_argument("--rate-limits", action="store_true", help="Keep the configured rate limits")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+    if args.seed is None:
+        args.seed = 1234
+    if not args.requests and not args.duration:
+        parser.error("set --requests and/or --duration")
+
+    report = asyncio.run(run(args))
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload)
+    else:
+        print(payload)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""
+Microbenchmarks for the small hot functions
+
+Covers ChatManager (add_message, get_conversation_context, get_stats) at
+10k-1M conversations, ChatChannelMemory.is_channel_allowed with many guilds,
+SarvamClient cache keys, cache writes at a full cache and AUTO-mode
+complexity scoring on long histories, plus _safe_send chunking.
+
+Results are saved per commit so runs can be compared across commits:
+
+    python -m benchmarks.microbench                          # all cases, default scales
+    python -m benchmarks.microbench --filter chat_manager --scales 10000,100000,1000000
+    python -m benchmarks.microbench --compare benchmarks/results/<old>.json benchmarks/results/<new>.json
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+from typing import Any, Callable, Dict, Iterator, Tuple
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# (name, zero-argument callable to time, operations performed per call)
+Case = Tuple[str, Callable[[], Any], int]
+
+
+def _environment() -> None:
+    os.environ.update({
+        "SARVAM_API_KEY": os.environ.get("SARVAM_API_KEY", "benchmark"),
+        "SARVAM_TRANSPORT": "http",
+        "DISK_CACHE_PATH": "",
+        "METRICS_PORT": "0",
+    })
+
+
+def _sample_text(index: int) -> str:
+    return f"message number {index}: how would you explain caching to a new developer?"
+
+
+# ---------------------------------------------------------------------------
+# cases
+# ---------------------------------------------------------------------------
+
+def chat_manager_cases(scale: int) -> Iterator[Case]:
+    from bot.chat_manager import ChatManager
+
+    manager = ChatManager(max_history=20, token_budget=3000)
+    for channel in range(scale):
+        manager.add_message(channel, 1_000_000 + channel, _sample_text(channel), "user")
+    # a handful of busy channels with full histories
+    busy = list(range(min(scale, 100)))
+    for channel in busy:
+        for turn in range(20):
+            manager.add_message(channel, 1_000_000 + channel, _sample_text(turn), "user" if turn % 2 else "assistant")
+
+    channels = iter(range(10 ** 12))
+
+    def add_message():
+        channel = next(channels) % scale
+        manager.add_message(channel, 1_000_000 + channel, "a short follow-up question", "user")
+
+    busy_cycle = iter(range(10 ** 12))
+
+    def get_context():
+        manager.get_conversation_context(channel_id=busy[next(busy_cycle) % len(busy)])
+
+    yield f"chat_manager.add_message[{scale}]", add_message, 1
+    yield f"chat_manager.get_conversation_context[{scale}]", get_context, 1
+    yield f"chat_manager.get_stats[{scale}]", manager.get_stats, 1
+
+
+def channel_memory_cases(scale: int) -> Iterator[Case]:
+    from bot.store import ChatChannelMemory
+
+    memory = ChatChannelMemory.__new__(ChatChannelMemory)
+    memory.data = {str(guild): 500_000 + guild for guild in range(scale)}
+    hit = 500_000 + scale // 2
+    miss = 42
+
+    yield f"channel_memory.is_channel_allowed.hit[{scale}]", lambda: memory.is_channel_allowed(hit), 1
+    yield f"channel_memory.is_channel_allowed.miss[{scale}]", lambda: memory.is_channel_allowed(miss), 1
+
+
+def sarvam_client_cases(scale: int) -> Iterator[Case]:
+    from bot.config import BotConfig
+    from bot.context_hash import hash_messages
+    from bot.sarvam_client import SarvamClient
+
+    client = SarvamClient(BotConfig())
+    history = [
+        {"role": "user" if i % 2 else "assistant", "content": _sample_text(i)}
+        for i in range(20)
+    ]
+    context_key = hash_messages(history)
+    yield "sarvam_client._generate_cache_key.hashing[20 msgs]", lambda: client._generate_cache_key(history), 1
+    yield (
+        "sarvam_client._generate_cache_key.context_key",
+        lambda: client._generate_cache_key(history, False, context_key),
+        1,
+    )
+
+    # fill the cache until it starts evicting, then every write evicts
+    reply = "x" * 800
+    filled = 0
+    while client.response_cache.get_stats()["evictions"] == 0:
+        client._cache_response(f"fill-{filled}", reply)
+        filled += 1
+    keys = iter(range(10 ** 12))
+    yield (
+        f"sarvam_client._cache_response.full[{filled} entries]",
+        lambda: client._cache_response(f"new-{next(keys)}", reply),
+        1,
+    )
+
+    for length in (20, 200, 2000):
+        messages = [
+            {"role": "user" if i % 2 else "assistant", "content": _sample_text(i)}
+            for i in range(length)
+        ]
+        yield (
+            f"sarvam_client._is_complex_query[{length} msgs]",
+            lambda messages=messages: client._is_complex_query(messages),
+            1,
+        )
+
+
+class _NullChannel:
+    async def send(self, content=None, **kwargs):
+        return None
+
+
+def safe_send_cases(scale: int) -> Iterator[Case]:
+    from bot.discord_client import _safe_send
+
+    loop = asyncio.new_event_loop()
+    channel = _NullChannel()
+    batch = 50
+    words = "lorem ipsum dolor sit amet consectetur adipiscing elit ".split()
+    for size in (2_000, 4_000, 8_000):
+        text = ""
+        i = 0
+        while len(text) < size:
+            text += words[i % len(words)] + ("\n" if i % 12 == 11 else " ")
+            i += 1
+        payload = text[:size]
+
+        async def many(payload=payload):
+            for _ in range(batch):
+                await _safe_send(channel, payload)
+
+        yield f"discord_client._safe_send[{size} chars]", lambda many=many: loop.run_until_complete(many()), batch
+
+
+SUITES: Dict[str, Callable[[int], Iterator[Case]]] = {
+    "chat_manager": chat_manager_cases,
+    "channel_memory": channel_memory_cases,
+    "sarvam_client": sarvam_client_cases,
+    "safe_send": safe_send_cases,
+}
+
+# Suites whose cost depends on --scales; the rest run once
+SCALED = {"chat_manager", "channel_memory"}
+
+
+# ---------------------------------------------------------------------------
+# runner
+# ---------------------------------------------------------------------------
+
+def measure(func: Callable[[], Any], ops_per_call: int, repeat: int, min_time: float) -> Dict[str, float]:
+    """Per-operation time in nanoseconds (best and median of repeat runs)"""
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+    gc.collect()
+    runs = [t / (number * ops_per_call) * 1e9 for t in timer.repeat(repeat, number)]
+    return {
+        "best_ns": round(min(runs), 1),
+        "median_ns": round(statistics.median(runs), 1),
+        "stdev_ns": round(statistics.stdev(runs), 1) if len(runs) > 1 else 0.0,
+        "loops": number,
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    _environment()
+    scales = [int(s) for s in args.scales.split(",") if s]
+    results: Dict[str, Dict[str, float]] = {}
+    for suite_name, suite in SUITES.items():
+        if args.filter and args.filter not in suite_name:
+            continue
+        for scale in (scales if suite_name in SCALED else [0]):
+            for name, func, ops in suite(scale):
+                results[name] = measure(func, ops, args.repeat, args.min_time)
+                print(f"{name:60} {results[name]['median_ns'] / 1000:12.3f} us", file=sys.stderr)
+    return {
+        "commit": git_commit(),
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def compare(old_path: str, new_path: str, threshold: float) -> int:
+    """Print per-case ratios; returns the number of regressions beyond threshold"""
+    with open(old_path, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)
+    regressions = 0
+    print(f"{'case':60} {old['commit']:>12} {new['commit']:>12}   ratio")
+    for name in sorted(set(old["results"]) | set(new["results"])):
+        before = old["results"].get(name, {}).get("median_ns")
+        after = new["results"].get(name, {}).get("median_ns")
+        if before is None or after is None:
+            print(f"{name:60} {before or '-':>12} {after or '-':>12}")
+            continue
+        ratio = after / before if before else float("inf")
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif ratio < 1 - threshold:
+            flag = "  faster"
+        print(f"{name:60} {before / 1000:10.3f}us {after / 1000:10.3f}us {ratio:7.2f}x{flag}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Microbenchmarks for hot bot functions")
+    parser.add_argument("--filter", help="Only run suites whose name contains this")
+    parser.add_argument("--scales", default="10000,100000", help="Conversation/guild counts, comma separated")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds per timing run")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Compare two result files")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative change reported as a regression")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(1 if compare(*args.compare, args.threshold) else 0)
+
+    report = run(args)
+    output = args.output or os.path.join(RESULTS_DIR, f"{report['commit']}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved {len(report['results'])} results to {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Local stand-in for the Sarvam chat completions API
+
+Implements the /v1/chat/completions contract SarvamClient relies on (plain
+JSON replies and SSE streaming) with configurable latency, error and 429
+injection, so throughput can be measured without spending API credits.
+
+    python -m benchmarks.mock_sarvam_server --port 8600 --latency-ms 400 --error-rate 0.02
+
+Point the bot (or benchmarks.loadgen) at it with
+SARVAM_TRANSPORT=http and SARVAM_BASE_URL=http://127.0.0.1:8600/v1/chat/completions
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+
+WORDS = (
+    "the quick brown fox jumps over a lazy dog while sarvam answers every "
+    "question about python discord caching latency and throughput"
+).split()
+
+
+@dataclass
+class MockOptions:
+    """Behaviour of the mock server"""
+    latency_dist: str = "lognormal"    # fixed, uniform, exponential or lognormal
+    latency_ms: float = 300.0          # mean (median for lognormal)
+    latency_sigma: float = 0.5         # lognormal shape / uniform half-width ratio
+    thinking_penalty_ms: float = 1500.0
+    error_rate: float = 0.0            # fraction of requests answered with HTTP 500
+    rate_limit_rate: float = 0.0       # fraction answered with HTTP 429
+    retry_after: float = 1.0
+    reply_words: int = 60
+    stream_chunk_words: int = 4
+    seed: Optional[int] = None
+
+
+class MockSarvamServer:
+    """aiohttp application serving fake chat completions"""
+
+    def __init__(self, options: MockOptions):
+        self.options = options
+        self.rng = random.Random(options.seed)
+        self.stats: Dict[str, int] = {
+            "requests": 0,
+            "streamed": 0,
+            "thinking": 0,
+            "errors_injected": 0,
+            "rate_limited": 0,
+        }
+        self.app = web.Application()
+        self.app.router.add_post("/v1/chat/completions", self.handle_completions)
+        self.app.router.add_get("/stats", self.handle_stats)
+        self._runner: Optional[web.AppRunner] = None
+
+    def _latency(self, thinking: bool) -> float:
+        """Seconds to wait before answering"""
+        o = self.options
+        mean = o.latency_ms / 1000
+        if o.latency_dist == "fixed":
+            delay = mean
+        elif o.latency_dist == "uniform":
+            delay = self.rng.uniform(mean * (1 - o.latency_sigma), mean * (1 + o.latency_sigma))
+        elif o.latency_dist == "exponential":
+            delay = self.rng.expovariate(1 / mean) if mean > 0 else 0.0
+        else:
+            delay = self.rng.lognormvariate(0, o.latency_sigma) * mean
+        if thinking:
+            delay += o.thinking_penalty_ms / 1000
+        return max(0.0, delay)
+
+    def _reply_text(self, messages: List[Dict[str, Any]]) -> str:
+        last = messages[-1].get("content", "") if messages else ""
+        words = [self.rng.choice(WORDS) for _ in range(self.options.reply_words)]
+        return f"Echo: {last[:80]} -- " + " ".join(words)
+
+    @staticmethod
+    def _completion(text: str, model: str) -> Dict[str, Any]:
+        return {
+            "id": f"mock-{time.time_ns()}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": text},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": len(text.split()), "total_tokens": 0},
+        }
+
+    async def handle_completions(self, request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        self.stats["requests"] += 1
+        thinking = (body.get("thinking") or {}).get("type") == "enabled"
+        self.stats["thinking"] += thinking
+
+        roll = self.rng.random()
+        if roll < self.options.rate_limit_rate:
+            self.stats["rate_limited"] += 1
+            return web.json_response(
+                {"error": {"message": "Rate limit exceeded"}},
+                status=429,
+                headers={"Retry-After": f"{self.options.retry_after:g}"},
+            )
+        if roll < self.options.rate_limit_rate + self.options.error_rate:
+            self.stats["errors_injected"] += 1
+            await asyncio.sleep(self._latency(False) / 2)
+            return web.json_response({"error": {"message": "Injected failure"}}, status=500)
+
+        delay = self._latency(thinking)
+        text = self._reply_text(body.get("messages") or [])
+        model = body.get("model", "mock")
+
+        if not body.get("stream"):
+            await asyncio.sleep(delay)
+            return web.json_response(self._completion(text, model))
+
+        # Stream: first chunk after half the latency, the rest spread over the other half
+        self.stats["streamed"] += 1
+        words = text.split(" ")
+        size = max(1, self.options.stream_chunk_words)
+        chunks = [" ".join(words[i:i + size]) + " " for i in range(0, len(words), size)]
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        await asyncio.sleep(delay / 2)
+        gap = delay / 2 / max(1, len(chunks))
+        for index, chunk in enumerate(chunks):
+            if index:
+                await asyncio.sleep(gap)
+            payload = {"choices": [{"index": 0, "delta": {"content": chunk}}]}
+            await response.write(f"data: {json.dumps(payload)}\n\n".encode("utf-8"))
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    async def handle_stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.stats)
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8600) -> str:
+        """Start serving; returns the completions URL"""
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        if port == 0:
+            port = self._runner.addresses[0][1]
+        return f"http://{host}:{port}/v1/chat/completions"
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+def add_mock_arguments(parser: argparse.ArgumentParser) -> None:
+    """Register the MockOptions flags on a parser (shared with loadgen)"""
+    defaults = MockOptions()
+    parser.add_argument("--latency-dist", choices=["fixed", "uniform", "exponential", "lognormal"],
+                        default=defaults.latency_dist)
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms)
+    parser.add_argument("--latency-sigma", type=float, default=defaults.latency_sigma)
+    parser.add_argument("--thinking-penalty-ms", type=float, default=defaults.thinking_penalty_ms)
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate)
+    parser.add_argument("--rate-limit-rate", type=float, default=defaults.rate_limit_rate)
+    parser.add_argument("--retry-after", type=float, default=defaults.retry_after)
+    parser.add_argument("--reply-words", type=int, default=defaults.reply_words)
+    parser.add_argument("--stream-chunk-words", type=int, default=defaults.stream_chunk_words)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def options_from_args(args: argparse.Namespace) -> MockOptions:
+    return MockOptions(
+        latency_dist=args.latency_dist,
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        thinking_penalty_ms=args.thinking_penalty_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        reply_words=args.reply_words,
+        stream_chunk_words=args.stream_chunk_words,
+        seed=args.seed,
+    )
+
+
+async def _serve(options: MockOptions, host: str, port: int) -> None:
+    server = MockSarvamServer(options)
+    url = await server.start(host, port)
+    print(f"Mock Sarvam API listening on {url}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+        print(json.dumps(server.stats))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mock Sarvam chat completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve(options_from_args(args), args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Owner-only diagnostics commands for the Discord bot
+"""
+import io
+import json
+import os
+import time
+import asyncio
+import logging
+import threading
+from typing import List, Optional, Tuple
+
+import discord
+from discord.ext import commands
+
+from bot.metrics import metrics
+from bot.profiling import AllocationTracer, SamplingProfiler
+
+logger = logging.getLogger(__name__)
+
+
+class AdminCommands(commands.Cog):
+    """Live CPU profiling, allocation tracing and latency exports, limited to the bot owner"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.profiler: Optional[SamplingProfiler] = None
+        self.tracer = AllocationTracer()
+        self._profile_task: Optional[asyncio.Task] = None
+        self._trace_task: Optional[asyncio.Task] = None
+
+    async def cog_check(self, ctx: commands.Context) -> bool:
+        return ctx.author.id == self.bot.config.admin_user_id
+
+    async def cog_command_error(self, ctx: commands.Context, error: Exception):
+        if isinstance(error, commands.CheckFailure):
+            await ctx.send("❌ Only the bot owner can use diagnostics commands.")
+        elif isinstance(error, commands.BadArgument):
+            await ctx.send(f"❌ {error}")
+        else:
+            logger.error(f"Diagnostics command failed: {error}")
+            await ctx.send(f"⚠️ Diagnostics command failed: {error}")
+
+    async def cog_unload(self):
+        for task in (self._profile_task, self._trace_task):
+            if task is not None:
+                task.cancel()
+        if self.profiler is not None:
+            self.profiler.stop()
+        self.tracer.stop()
+
+    # ---------- helpers ----------
+
+    def _window(self, seconds: float) -> float:
+        return max(1.0, min(seconds, self.bot.config.profile_max_seconds))
+
+    async def _deliver(self, ctx: commands.Context, message: str, files: List[Tuple[str, str]]):
+        """Upload report files, or write them to PROFILE_OUTPUT_DIR when it is set"""
+        output_dir = self.bot.config.profile_output_dir
+        if output_dir:
+            stamp = time.strftime("%Y%m%d-%H%M%S")
+            os.makedirs(output_dir, exist_ok=True)
+            paths = []
+            for filename, content in files:
+                path = os.path.join(output_dir, f"{stamp}-{filename}")
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(content)
+                paths.append(path)
+            await ctx.send(f"{message}\nSaved to: " + ", ".join(f"`{p}`" for p in paths))
+            return
+
+        await ctx.send(
+            message,
+            files=[
+                discord.File(io.BytesIO(content.encode("utf-8")), filename=filename)
+                for filename, content in files
+            ],
+        )
+
+    async def _finish_profile(self, ctx: commands.Context):
+        profiler = self.profiler
+        self.profiler = None
+        self._profile_task = None
+        await asyncio.get_running_loop().run_in_executor(None, profiler.stop)
+        await self._deliver(
+            ctx,
+            f"🔬 CPU profile: {profiler.samples} samples.",
+            [("profile.txt", profiler.report()), ("profile.folded", profiler.folded())],
+        )
+
+    async def _profile_window(self, ctx: commands.Context, seconds: float):
+        await asyncio.sleep(seconds)
+        if self.profiler is not None:
+            await self._finish_profile(ctx)
+
+    async def _trace_window(self, ctx: commands.Context, seconds: float):
+        await asyncio.sleep(seconds)
+        self._trace_task = None
+        if self.tracer.started_here:
+            # Snapshots of a large heap take seconds; keep them off the event loop
+            report = await asyncio.get_running_loop().run_in_executor(None, self.tracer.snapshot_report)
+            self.tracer.stop()
+            await self._deliver(ctx, "🧠 Allocation trace window ended.", [("allocations.txt", report)])
+
+    # ---------- commands ----------
+
+    @commands.command(name="profile")
+    async def profile_command(self, ctx: commands.Context, action: str = "status",
+                              seconds: float = 30.0, interval_ms: float = 5.0):
+        """Sample the event loop thread's stacks: !profile start [seconds] [interval_ms] | stop | status"""
+        action = action.lower()
+        if action == "start":
+            if self.profiler is not None:
+                await ctx.send("⚠️ A profile is already running. Use `!profile stop` first.")
+                return
+            seconds = self._window(seconds)
+            self.profiler = SamplingProfiler(interval=max(1.0, interval_ms) / 1000)
+            self.profiler.start(threading.get_ident())
+            self._profile_task = asyncio.create_task(self._profile_window(ctx, seconds))
+            await ctx.send(f"🔬 Profiling for up to {seconds:.0f}s (every {self.profiler.interval * 1000:.0f} ms).")
+        elif action == "stop":
+            if self.profiler is None:
+                await ctx.send("No profile is running.")
+                return
+            if self._profile_task is not None:
+                self._profile_task.cancel()
+            await self._finish_profile(ctx)
+        elif action == "status":
+            if self.profiler is None:
+                await ctx.send("No profile is running.")
+            else:
+                await ctx.send(f"🔬 Profiling: {self.profiler.samples} samples so far.")
+        else:
+            await ctx.send("Usage: `!profile start [seconds] [interval_ms]`, `!profile stop`, `!profile status`")
+
+    @commands.command(name="memtrace")
+    async def memtrace_command(self, ctx: commands.Context, action: str = "status",
+                               seconds: float = 120.0, frames: int = 1):
+        """Trace allocations: !memtrace start [seconds] [frames] | snapshot | stop | status"""
+        action = action.lower()
+        if action == "start":
+            if self.tracer.started_here:
+                await ctx.send("⚠️ Allocation tracing is already on. Use `!memtrace stop` first.")
+                return
+            seconds = self._window(seconds)
+            self.tracer.start(max(1, min(frames, 25)))
+            self._trace_task = asyncio.create_task(self._trace_window(ctx, seconds))
+            await ctx.send(f"🧠 Tracing allocations for up to {seconds:.0f}s. Use `!memtrace snapshot` to compare.")
+        elif action in ("snapshot", "stop"):
+            if not self.tracer.started_here:
+                await ctx.send("Allocation tracing is not running. Use `!memtrace start`.")
+                return
+            report = await asyncio.get_running_loop().run_in_executor(None, self.tracer.snapshot_report)
+            if action == "stop":
+                if self._trace_task is not None:
+                    self._trace_task.cancel()
+                    self._trace_task = None
+                self.tracer.stop()
+            await self._deliver(ctx, f"🧠 Allocation {action}.", [("allocations.txt", report)])
+        elif action == "status":
+            await ctx.send("🧠 Allocation tracing is on." if self.tracer.started_here else "Allocation tracing is off.")
+        else:
+            await ctx.send("Usage: `!memtrace start [seconds] [frames]`, `!memtrace snapshot`, `!memtrace stop`")
+
+    @commands.command(name="latencydump")
+    async def latency_dump_command(self, ctx: commands.Context):
+        """Upload a JSON snapshot of the latency histograms"""
+        snapshot = json.dumps(metrics.snapshot(), indent=2)
+        await self._deliver(ctx, "📈 Latency histogram snapshot:", [("latency_snapshot.json", snapshot)])
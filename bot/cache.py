@@ -0,0 +1,238 @@
+"""
+In-memory response cache with O(1) LRU/LFU eviction, TTL reaping and a byte budget
+"""
+
+import heapq
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, Any
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheEntry:
+    """Cache entry with TTL support"""
+    content: str
+    ttl_seconds: int = 3600  # Default 1 hour
+    created_at: float = field(default_factory=time.monotonic)
+    hit_count: int = 0
+    size: int = 0
+
+    def __post_init__(self) -> None:
+        if not self.size:
+            self.size = len(self.content.encode("utf-8"))
+
+    @property
+    def expires_at(self) -> float:
+        return self.created_at + self.ttl_seconds
+
+    def is_expired(self, now: Optional[float] = None) -> bool:
+        """Check if cache entry has expired"""
+        return (now if now is not None else time.monotonic()) >= self.expires_at
+
+    def touch(self) -> None:
+        """Record a hit (does not extend the entry's lifetime)"""
+        self.hit_count += 1
+
+
+class ResponseCache:
+    """
+    Response cache bounded by the UTF-8 size of cached content.
+
+    Entries are evicted in least-recently-used ("lru") or least-frequently-used
+    ("lfu") order, both O(1). Expiry times are kept in a min-heap so expired
+    entries are reaped proactively on every access instead of only when hit.
+    Expired entries are kept for stale_grace more seconds so they can still
+    be served through get_stale() while upstream is down.
+    """
+
+    POLICIES = ("lru", "lfu")
+
+    def __init__(
+        self,
+        max_bytes: int = 8 * 1024 * 1024,
+        policy: str = "lru",
+        stale_grace: float = 0.0,
+    ):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown cache policy: {policy}")
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.stale_grace = stale_grace
+        self.current_bytes = 0
+
+        # LRU order lives in the OrderedDict itself; LFU keeps one
+        # insertion-ordered bucket per hit frequency.
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._freq_buckets: Dict[int, "OrderedDict[str, None]"] = {}
+        self._min_freq = 0
+
+        # (expires_at, key) pairs; stale pairs are skipped lazily
+        self._expiry_heap: List[Tuple[float, str]] = []
+
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "stale_hits": 0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and not entry.is_expired()
+
+    # ------------------------------------------------------------------
+    # frequency bookkeeping (LFU only)
+    # ------------------------------------------------------------------
+
+    def _freq_add(self, key: str, freq: int) -> None:
+        self._freq_buckets.setdefault(freq, OrderedDict())[key] = None
+
+    def _freq_remove(self, key: str, freq: int) -> None:
+        bucket = self._freq_buckets.get(freq)
+        if bucket is None:
+            return
+        bucket.pop(key, None)
+        if not bucket:
+            del self._freq_buckets[freq]
+
+    # ------------------------------------------------------------------
+    # core operations
+    # ------------------------------------------------------------------
+
+    def _remove(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        self.current_bytes -= entry.size
+        if self.policy == "lfu":
+            self._freq_remove(key, entry.hit_count + 1)
+        return entry
+
+    def _evict_one(self) -> None:
+        if self.policy == "lru":
+            key, entry = self._entries.popitem(last=False)
+            self.current_bytes -= entry.size
+        else:
+            if self._min_freq not in self._freq_buckets:
+                self._min_freq = min(self._freq_buckets)
+            key, _ = self._freq_buckets[self._min_freq].popitem(last=False)
+            if not self._freq_buckets[self._min_freq]:
+                del self._freq_buckets[self._min_freq]
+            entry = self._entries.pop(key)
+            self.current_bytes -= entry.size
+        self.stats["evictions"] += 1
+        logger.debug(f"Evicted cache entry: {key}")
+
+    def reap_expired(self, now: Optional[float] = None) -> int:
+        """Drop every entry whose TTL (plus stale grace) has passed; returns the number removed"""
+        now = now if now is not None else time.monotonic()
+        removed = 0
+        heap = self._expiry_heap
+        cutoff = now - self.stale_grace
+        while heap and heap[0][0] <= cutoff:
+            expires_at, key = heapq.heappop(heap)
+            entry = self._entries.get(key)
+            # Skip pairs left behind by entries that were replaced or evicted
+            if entry is not None and entry.expires_at == expires_at:
+                self._remove(key)
+                removed += 1
+        self.stats["expirations"] += removed
+
+        # Keep the heap from growing without bound under heavy overwrites
+        if len(heap) > 2 * len(self._entries) + 64:
+            self._expiry_heap = [(e.expires_at, k) for k, e in self._entries.items()]
+            heapq.heapify(self._expiry_heap)
+        return removed
+
+    def get(self, key: str) -> Optional[str]:
+        """Return cached content for key, or None on miss/expiry"""
+        now = time.monotonic()
+        self.reap_expired(now)
+
+        entry = self._entries.get(key)
+        if entry is None or entry.is_expired(now):
+            self.stats["misses"] += 1
+            return None
+
+        if self.policy == "lru":
+            self._entries.move_to_end(key)
+        else:
+            freq = entry.hit_count + 1
+            self._freq_remove(key, freq)
+            self._freq_add(key, freq + 1)
+            if self._min_freq == freq and freq not in self._freq_buckets:
+                self._min_freq = freq + 1
+        entry.touch()
+        self.stats["hits"] += 1
+        logger.debug(f"Cache HIT (count: {entry.hit_count}): {key}")
+        return entry.content
+
+    def get_stale(self, key: str) -> Optional[str]:
+        """Return content for key even if expired (within the stale grace period)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self.stats["stale_hits"] += 1
+        return entry.content
+
+    def put(self, key: str, content: str, ttl_seconds: int = 3600) -> bool:
+        """
+        Store content under key
+
+        Args:
+            key: Cache key
+            content: Response text
+            ttl_seconds: Lifetime of the entry
+
+        Returns:
+            False if the entry is larger than the whole byte budget
+        """
+        now = time.monotonic()
+        self.reap_expired(now)
+
+        entry = CacheEntry(content, ttl_seconds=ttl_seconds, created_at=now)
+        self._remove(key)
+        if entry.size > self.max_bytes:
+            return False
+
+        while self._entries and self.current_bytes + entry.size > self.max_bytes:
+            self._evict_one()
+
+        self._entries[key] = entry
+        self.current_bytes += entry.size
+        if self.policy == "lfu":
+            self._freq_add(key, 1)
+            self._min_freq = 1
+        heapq.heappush(self._expiry_heap, (entry.expires_at, key))
+        logger.debug(f"Cached response: {key}")
+        return True
+
+    def delete(self, key: str) -> bool:
+        """Remove key from the cache"""
+        return self._remove(key) is not None
+
+    def clear(self) -> None:
+        """Remove every entry (counters are kept)"""
+        self._entries.clear()
+        self._freq_buckets.clear()
+        self._expiry_heap.clear()
+        self._min_freq = 0
+        self.current_bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "policy": self.policy,
+        }
@@ -9,6 +9,8 @@ from typing import List, Dict, Any
 import discord
 from discord.ext import commands
 import bot
+from bot.metrics import metrics
+from bot.scheduler import Priority
 from bot.store import ChatChannelMemory
 channel_memory = ChatChannelMemory()
 from bot.study_commands import StudyCommands
@@ -311,7 +313,12 @@ class FunCommands(commands.Cog):
                 {"role": "user", "content": question}
             ]
 
-            response = await self.bot.sarvam_client.generate_response(context)
+            response = await self.bot.sarvam_client.generate_response(
+                context,
+                guild_id=ctx.guild.id if ctx.guild else None,
+                user_id=ctx.author.id,
+                priority=Priority.COMMAND,
+            )
 
             if response and response.strip():
                 # Send in 2000-character chunks
@@ -432,7 +439,12 @@ class FunCommands(commands.Cog):
             context = [
                 {"role": "user", "content": prompt}
             ]
-            response = await self.bot.sarvam_client.generate_response(context)
+            response = await self.bot.sarvam_client.generate_response(
+                context,
+                guild_id=ctx.guild.id if ctx.guild else None,
+                user_id=ctx.author.id,
+                priority=Priority.COMMAND,
+            )
             embed = discord.Embed(
                 title=f"📖 Definition: {word}",
                 description=response or "Sorry, I couldn't find a definition.",
@@ -448,7 +460,12 @@ class FunCommands(commands.Cog):
             context = [
                 {"role": "user", "content": prompt}
             ]
-            response = await self.bot.sarvam_client.generate_response(context)
+            response = await self.bot.sarvam_client.generate_response(
+                context,
+                guild_id=ctx.guild.id if ctx.guild else None,
+                user_id=ctx.author.id,
+                priority=Priority.COMMAND,
+            )
             embed = discord.Embed(
                 title="💡 Quote",
                 description=response or "Sorry, I couldn't fetch a quote right now.",
@@ -481,7 +498,7 @@ class FunCommands(commands.Cog):
 
         # Admin-only section (only shown to admins)
         if is_admin:
-            embed.add_field(name="🛡️ Admin Commands", value="`!setchannel`, `!unsetchannel`, `!setprefix`", inline=False)
+            embed.add_field(name="🛡️ Admin Commands", value="`!setchannel`, `!unsetchannel`, `!setprefix`, `!latencydump`, `!profile`, `!memtrace`", inline=False)
 
         embed.set_footer(text="Use responsibly. AI remembers what you teach it. 🤖")
 
@@ -511,5 +528,20 @@ class FunCommands(commands.Cog):
         embed.add_field(name="Discord.py Version", value=discord.__version__, inline=True)
         embed.add_field(name="System", value=platform.system(), inline=True)
 
+        # Per-stage pipeline latency (p50 / p90 / p99)
+        lines = []
+        for stage, summary in metrics.summary().items():
+            if summary["count"]:
+                lines.append(
+                    f"`{stage}` {summary['p50_ms']:.0f} / {summary['p90_ms']:.0f} / "
+                    f"{summary['p99_ms']:.0f} ms ({summary['count']})"
+                )
+        if lines:
+            embed.add_field(
+                name="Latency p50 / p90 / p99",
+                value="\n".join(lines)[:1024],
+                inline=False
+            )
+
         await ctx.send(embed=embed)
 
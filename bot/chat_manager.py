@@ -2,31 +2,259 @@
 Chat history and context management
 """
 
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional
-from collections import defaultdict, deque
+import sys
+import time
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Callable, Awaitable, Sequence, Set, Tuple
+from collections import OrderedDict, defaultdict
+
+from bot.complexity import conversation_score, message_features
+from bot.context_hash import ContextKey, RollingConversationHash, message_digest
+from bot.context_view import ContextView, FrozenMessage
+from bot.history_store import HistoryStore
+from bot.tokens import estimate_message_tokens
 
 logger = logging.getLogger(__name__)
 
+# (previous summary, evicted turns) -> new summary, or None on failure
+Summarizer = Callable[[Optional[str], List[Dict[str, str]]], Awaitable[Optional[str]]]
+
+# While summaries keep failing, keep at most this many times summary_min_turns
+# pending turns per conversation (oldest dropped first)
+SUMMARY_PENDING_FACTOR = 4
+# Wait before retrying a failed summary, doubling per consecutive failure
+SUMMARY_RETRY_BASE = 30.0
+SUMMARY_RETRY_MAX = 900.0
+
+
+@dataclass
+class ConversationSummary:
+    """Rolling summary of turns that have left a conversation's history"""
+    text: str
+    version: int
+    turns_covered: int
+    tokens: int
+    digest: int
+
+    @property
+    def content(self) -> str:
+        return f"Summary of the earlier conversation: {self.text}"
+
+    def as_message(self) -> Dict[str, str]:
+        return FrozenMessage(role="system", content=self.content)
+
+
+class MessageRecord(FrozenMessage):
+    """
+    One stored chat message, shared by the channel and user indexes
+    
+    The record is its own API view: the read-only dict holds exactly the
+    "role" and "content" keys the chat completions API expects, so contexts
+    reuse it instead of building a new dict per request. Bookkeeping lives
+    in slots.
+    """
+    
+    __slots__ = ("user_id", "timestamp", "tokens", "complexity")
+    
+    def __init__(self, role: str, content: str, user_id: int, timestamp: Optional[float] = None):
+        dict.__init__(self, role=sys.intern(role), content=content)
+        self.user_id = user_id
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.tokens = estimate_message_tokens(content)
+        # Only user turns drive AUTO thinking mode
+        self.complexity = message_features(content) if role == "user" else 0.0
+    
+    @property
+    def role(self) -> str:
+        return self["role"]
+    
+    @property
+    def content(self) -> str:
+        return self["content"]
+
+
+class Conversation:
+    """
+    History of one channel or DM, with its rolling hash kept in step
+    
+    Messages go into an append-only list and the history window is its last
+    max_history entries. Once max_history messages have slid out, the window
+    is copied into a fresh list, keeping appends amortized O(1); views handed
+    out earlier keep the old list, so they never change under a request.
+    """
+    
+    __slots__ = ("messages", "start", "max_history", "hashes", "last_active", "context", "chars", "tokens")
+    
+    def __init__(self, max_history: int):
+        self.messages: List[MessageRecord] = []
+        self.start = 0
+        self.max_history = max_history
+        self.hashes = RollingConversationHash(max_history)
+        self.last_active = time.monotonic()
+        # (include_system, token_budget, summary) and the view built for them
+        self.context: Optional[Tuple[Tuple[Any, ...], ContextView]] = None
+        # Characters and estimated tokens held in the window
+        self.chars = 0
+        self.tokens = 0
+    
+    def __len__(self) -> int:
+        return len(self.messages) - self.start
+    
+    @property
+    def history(self) -> ContextView:
+        return ContextView(self.messages, self.start)
+    
+    @property
+    def full(self) -> bool:
+        return len(self) >= self.max_history
+    
+    def append(self, message: MessageRecord, digest: int) -> None:
+        messages = self.messages
+        messages.append(message)
+        self.chars += len(message.content)
+        self.tokens += message.tokens
+        if len(messages) - self.start > self.max_history:
+            evicted = messages[self.start]
+            self.chars -= len(evicted.content)
+            self.tokens -= evicted.tokens
+            self.start += 1
+            if self.start >= self.max_history:
+                self.messages = messages[self.start:]
+                self.start = 0
+        self.hashes.append(digest)
+        self.context = None
+
+
 class ChatManager:
     """Manages chat history and context for conversations"""
     
-    def __init__(self, max_history: int = 20):
+    def __init__(
+        self,
+        max_history: int = 20,
+        token_budget: Optional[int] = None,
+        summary_min_turns: int = 6,
+        idle_ttl: float = 0,
+        max_conversations: int = 0,
+        store: Optional[HistoryStore] = None
+    ):
         self.max_history = max_history
-        # Store chat history per channel/user
-        self.channel_histories: Dict[int, deque] = defaultdict(
-            lambda: deque(maxlen=self.max_history)
-        )
-        self.user_histories: Dict[int, deque] = defaultdict(
-            lambda: deque(maxlen=self.max_history)
-        )
+        # Default prompt budget for history (None = limit by message count only)
+        self.token_budget = token_budget
+        # Conversations keyed by ("channel"|"user", id), least recently active first
+        self.conversations: "OrderedDict[Tuple[str, int], Conversation]" = OrderedDict()
+        # Drop conversations idle this long (seconds, 0 = never)
+        self.idle_ttl = idle_ttl
+        # Keep at most this many conversations, evicting the least recently active (0 = no cap)
+        self.max_conversations = max_conversations
+        # Running gauges and counters, kept in step with every change so get_stats is O(1)
+        self._live = {"channel": 0, "user": 0}
+        self._held = {"channel": 0, "user": 0}
+        self._held_chars = 0
+        self._held_tokens = 0
+        self.messages_added: Dict[str, int] = defaultdict(int)
+        self.characters_added = 0
+        self.tokens_added = 0
+        self.evicted_idle = 0
+        self.evicted_lru = 0
+        self._sweep_task: Optional[asyncio.Task] = None
+        # Durable copy of the histories; conversations are loaded lazily on first use
+        self.store = store
+        self._loading: Dict[Tuple[str, int], asyncio.Task] = {}
+        self._background: Set[asyncio.Task] = set()
+        
+        # Rolling summaries of evicted turns, keyed by ("channel"|"user", id)
+        self.summarizer: Optional[Summarizer] = None
+        self.summary_min_turns = summary_min_turns
+        self.summaries: Dict[Tuple[str, int], ConversationSummary] = {}
+        self._evicted_turns: Dict[Tuple[str, int], List[Dict[str, str]]] = defaultdict(list)
+        self._summary_tasks: Dict[Tuple[str, int], asyncio.Task] = {}
+        # Consecutive failures and earliest retry time per conversation
+        self._summary_backoff: Dict[Tuple[str, int], Tuple[int, float]] = {}
+        self.summary_failures = 0
+        self.summary_turns_dropped = 0
+    
+    def set_summarizer(self, summarizer: Optional[Summarizer]) -> None:
+        """Enable rolling summaries of evicted turns using the given coroutine"""
+        self.summarizer = summarizer
+    
+    def _record_eviction(self, conversation: Tuple[str, int], state: Conversation) -> None:
+        """Remember the turn about to fall out of a full history"""
+        if self.summarizer is None or not state.full:
+            return
+        
+        pending = self._evicted_turns[conversation]
+        pending.append(state.messages[state.start])
+        self._trim_pending(pending)
+        
+        if len(pending) < self.summary_min_turns or conversation in self._summary_tasks:
+            return
+        backoff = self._summary_backoff.get(conversation)
+        if backoff is not None and time.monotonic() < backoff[1]:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self._update_summary(conversation))
+        self._summary_tasks[conversation] = task
+    
+    def _trim_pending(self, pending: List[Dict[str, str]]) -> None:
+        """Drop the oldest pending turns beyond the cap so failed summaries cannot snowball"""
+        excess = len(pending) - self.summary_min_turns * SUMMARY_PENDING_FACTOR
+        if excess > 0:
+            del pending[:excess]
+            self.summary_turns_dropped += excess
+    
+    async def _update_summary(self, conversation: Tuple[str, int]) -> None:
+        """Fold pending evicted turns into the conversation summary (runs in the background)"""
+        try:
+            turns = self._evicted_turns.pop(conversation, [])
+            if not turns:
+                return
+            previous = self.summaries.get(conversation)
+            try:
+                text = await self.summarizer(previous.text if previous else None, turns)
+            except Exception as e:
+                logger.warning(f"Summarization failed for {conversation}: {e}")
+                text = None
+            
+            if not text:
+                # Keep the turns for the next attempt, after a backoff
+                pending = self._evicted_turns[conversation]
+                pending[:0] = turns
+                self._trim_pending(pending)
+                failures = self._summary_backoff.get(conversation, (0, 0.0))[0] + 1
+                delay = min(SUMMARY_RETRY_MAX, SUMMARY_RETRY_BASE * 2 ** (failures - 1))
+                self._summary_backoff[conversation] = (failures, time.monotonic() + delay)
+                self.summary_failures += 1
+                return
+            
+            self._summary_backoff.pop(conversation, None)
+            
+            summary = ConversationSummary(
+                text=text.strip(),
+                version=previous.version + 1 if previous else 1,
+                turns_covered=(previous.turns_covered if previous else 0) + len(turns),
+                tokens=0,
+                digest=0,
+            )
+            summary.tokens = estimate_message_tokens(summary.content)
+            summary.digest = message_digest("system", summary.content)
+            self.summaries[conversation] = summary
+            logger.debug(f"Updated summary for {conversation} to v{self.summaries[conversation].version}")
+        finally:
+            if self._summary_tasks.get(conversation) is asyncio.current_task():
+                del self._summary_tasks[conversation]
     
     def add_message(
         self, 
         channel_id: int, 
         user_id: int, 
         content: str, 
-        role: str = "user"
+        role: str = "user",
+        dm: bool = False
     ):
         """
         Add a message to chat history
@@ -36,24 +264,97 @@ class ChatManager:
             user_id: Discord user ID
             content: Message content
             role: Message role (user, assistant, system)
+            dm: Whether the channel is a DM, whose context is served from the
+                user history instead of the channel history
         """
-        message = {
-            "role": role,
-            "content": content,
-            "timestamp": None,  # Could add timestamp if needed
-            "user_id": user_id
-        }
+        message = MessageRecord(role, content, user_id)
         
-        # Add to channel history
-        self.channel_histories[channel_id].append(message)
+        digest = message_digest(role, content)
         
-        # Add to user history for DMs
+        # Add to channel history
+        keys = [("channel", channel_id)]
+        # Add the same record to the user history for DMs
         if role == "user":
-            self.user_histories[user_id].append(message)
+            keys.append(("user", user_id))
+        # Only the conversation that gets served is worth summarizing
+        served = ("user", user_id) if dm else ("channel", channel_id)
+        
+        for key in keys:
+            conversation = self._touch(key)
+            if key == served:
+                self._record_eviction(key, conversation)
+            self._append(key[0], conversation, message, digest)
+            if self.store is not None:
+                self.store.append(key, message.role, content, user_id, message.timestamp)
+        
+        self.messages_added[message.role] += 1
+        self.characters_added += len(content)
+        self.tokens_added += message.tokens
         
         logger.debug(f"Added message to history - Channel: {channel_id}, User: {user_id}")
     
-    def get_channel_history(self, channel_id: int) -> List[Dict[str, Any]]:
+    def _append(self, kind: str, conversation: Conversation, message: MessageRecord, digest: int) -> None:
+        """Append to a conversation and move the running totals by what changed"""
+        size, chars, tokens = len(conversation), conversation.chars, conversation.tokens
+        conversation.append(message, digest)
+        self._held[kind] += len(conversation) - size
+        self._held_chars += conversation.chars - chars
+        self._held_tokens += conversation.tokens - tokens
+    
+    async def ensure_loaded(self, channel_id: Optional[int] = None, user_id: Optional[int] = None) -> None:
+        """
+        Load stored history for conversations not in memory yet
+        
+        Call before add_message so a conversation picks up where it left off
+        after a restart or an idle eviction. Concurrent calls for the same
+        conversation share one load.
+        
+        Args:
+            channel_id: Discord channel ID
+            user_id: Discord user ID
+        """
+        if self.store is None:
+            return
+        
+        keys = []
+        if channel_id:
+            keys.append(("channel", channel_id))
+        if user_id:
+            keys.append(("user", user_id))
+        
+        waits = []
+        for key in keys:
+            if key in self.conversations:
+                continue
+            task = self._loading.get(key)
+            if task is None:
+                task = asyncio.get_running_loop().create_task(self._load(key))
+                self._loading[key] = task
+            waits.append(task)
+        if waits:
+            await asyncio.gather(*waits)
+    
+    async def _load(self, key: Tuple[str, int]) -> None:
+        try:
+            rows = await self.store.load(key, self.max_history)
+        except Exception as e:
+            logger.warning(f"Could not load stored history for {key}: {e}")
+            return
+        finally:
+            self._loading.pop(key, None)
+        
+        # Messages added while the load was running win over the stored copy
+        if not rows or key in self.conversations:
+            return
+        conversation = self._touch(key)
+        for role, content, user_id, timestamp in rows:
+            self._append(
+                key[0], conversation,
+                MessageRecord(role, content, user_id, timestamp), message_digest(role, content)
+            )
+        logger.debug(f"Loaded {len(rows)} stored messages for {key}")
+    
+    def get_channel_history(self, channel_id: int) -> List[MessageRecord]:
         """
         Get chat history for a specific channel
         
@@ -61,11 +362,12 @@ class ChatManager:
             channel_id: Discord channel ID
             
         Returns:
-            List of message dictionaries
+            List of message records
         """
-        return list(self.channel_histories[channel_id])
+        conversation = self.conversations.get(("channel", channel_id))
+        return list(conversation.history) if conversation is not None else []
     
-    def get_user_history(self, user_id: int) -> List[Dict[str, Any]]:
+    def get_user_history(self, user_id: int) -> List[MessageRecord]:
         """
         Get chat history for a specific user (for DMs)
         
@@ -73,50 +375,150 @@ class ChatManager:
             user_id: Discord user ID
             
         Returns:
-            List of message dictionaries
+            List of message records
+        """
+        conversation = self.conversations.get(("user", user_id))
+        return list(conversation.history) if conversation is not None else []
+    
+    def _context_start(
+        self,
+        history: Sequence[MessageRecord],
+        token_budget: Optional[int],
+        summary: Optional[ConversationSummary] = None
+    ) -> int:
         """
-        return list(self.user_histories[user_id])
+        Index of the oldest message that fits, packing newest turns first
+        
+        Messages before this index are still in the window but are neither
+        sent nor summarized yet: summaries only cover turns that leave the
+        window. A tight budget therefore leaves a gap between the summary and
+        the oldest message sent until those turns are evicted.
+        """
+        if token_budget is None:
+            token_budget = self.token_budget
+        if token_budget is None:
+            return 0
+        
+        used = summary.tokens if summary is not None else 0
+        for index in range(len(history) - 1, -1, -1):
+            used += history[index].tokens
+            # The newest message is always sent, even if it alone is too big
+            if used > token_budget and index < len(history) - 1:
+                return index + 1
+        return 0
     
     def get_conversation_context(
         self, 
         channel_id: Optional[int] = None, 
         user_id: Optional[int] = None,
-        include_system: bool = True
-    ) -> List[Dict[str, str]]:
+        include_system: bool = True,
+        token_budget: Optional[int] = None
+    ) -> ContextView:
         """
         Get conversation context for API calls
         
+        The view is built once per conversation state and shared by every
+        caller until the next message arrives; it never copies messages and
+        cannot be modified.
+        
         Args:
             channel_id: Discord channel ID (for channel conversations)
             user_id: Discord user ID (for DM conversations)
             include_system: Whether to include system messages
+            token_budget: Max estimated prompt tokens for history
+                (defaults to the manager's token_budget)
             
         Returns:
-            List of messages formatted for OpenRouter API
+            Read-only sequence of messages formatted for the chat completions API
         """
         if channel_id:
-            history = self.get_channel_history(channel_id)
+            key = ("channel", channel_id)
         elif user_id:
-            history = self.get_user_history(user_id)
+            key = ("user", user_id)
         else:
-            return []
+            return ContextView()
+        
+        conversation = self.conversations.get(key)
+        summary = self.summaries.get(key)
+        prefix = (summary.as_message(),) if summary is not None and include_system else ()
+        if conversation is None:
+            return ContextView(prefix=prefix)
         
-        # Filter and format messages for API
-        api_messages = []
+        params = (include_system, token_budget, summary)
+        if conversation.context is not None and conversation.context[0] == params:
+            return conversation.context[1]
         
-        for message in history:
+        history = conversation.history
+        view = history[self._context_start(history, token_budget, summary):]
+        if not include_system and any(message.role == "system" for message in view):
             # Skip system messages if not requested
-            if not include_system and message["role"] == "system":
-                continue
+            view = ContextView(tuple(message for message in view if message.role != "system"))
+        view = view.with_prefix(*prefix)
+        conversation.context = (params, view)
+        return view
+    
+    def get_context_key(
+        self,
+        channel_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+        token_budget: Optional[int] = None
+    ) -> Optional[ContextKey]:
+        """
+        Get the order-preserving hash of a conversation context in O(1)
+        
+        Args:
+            channel_id: Discord channel ID (for channel conversations)
+            user_id: Discord user ID (for DM conversations)
+            token_budget: Same budget as passed to get_conversation_context
             
-            # Format for API
-            api_message = {
-                "role": message["role"],
-                "content": message["content"]
-            }
-            api_messages.append(api_message)
+        Returns:
+            Key matching get_conversation_context() with include_system=True
+        """
+        if channel_id:
+            conversation = self.conversations.get(("channel", channel_id))
+            summary = self.summaries.get(("channel", channel_id))
+        elif user_id:
+            conversation = self.conversations.get(("user", user_id))
+            summary = self.summaries.get(("user", user_id))
+        else:
+            return None
         
-        return api_messages
+        if conversation is None:
+            key = ContextKey(0, 0)
+        else:
+            start = self._context_start(conversation.history, token_budget, summary)
+            key = conversation.hashes.key(start)
+        if summary is not None:
+            key = key.prepend(summary.digest)
+        return key
+    
+    def get_complexity(
+        self,
+        channel_id: Optional[int] = None,
+        user_id: Optional[int] = None
+    ) -> Optional[float]:
+        """
+        Get the complexity score of a conversation from cached per-message features
+        
+        Args:
+            channel_id: Discord channel ID (for channel conversations)
+            user_id: Discord user ID (for DM conversations)
+            
+        Returns:
+            Decayed score weighted towards the latest user turn, or None if unknown
+        """
+        if channel_id:
+            conversation = self.conversations.get(("channel", channel_id))
+        elif user_id:
+            conversation = self.conversations.get(("user", user_id))
+        else:
+            return None
+        
+        if conversation is None or not conversation:
+            return None
+        return conversation_score(
+            message.complexity for message in reversed(conversation.history) if message.role == "user"
+        )
     
     def clear_history(self, channel_id: Optional[int] = None, user_id: Optional[int] = None):
         """
@@ -126,30 +528,140 @@ class ChatManager:
             channel_id: Discord channel ID to clear
             user_id: Discord user ID to clear
         """
-        if channel_id and channel_id in self.channel_histories:
-            self.channel_histories[channel_id].clear()
+        if channel_id and self._drop(("channel", channel_id)):
             logger.info(f"Cleared history for channel {channel_id}")
         
-        if user_id and user_id in self.user_histories:
-            self.user_histories[user_id].clear()
+        if user_id and self._drop(("user", user_id)):
             logger.info(f"Cleared history for user {user_id}")
+        
+        if self.store is not None:
+            for key in (("channel", channel_id), ("user", user_id)):
+                if key[1]:
+                    self._spawn(self.store.delete(key))
+    
+    def _spawn(self, coro: Awaitable[Any]) -> None:
+        """Run a store coroutine in the background, keeping a reference until it finishes"""
+        task = asyncio.get_running_loop().create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+    
+    def _touch(self, key: Tuple[str, int]) -> Conversation:
+        """Conversation for key marked as most recently active, created if needed"""
+        conversation = self.conversations.get(key)
+        if conversation is None:
+            conversation = self.conversations[key] = Conversation(self.max_history)
+            self._live[key[0]] += 1
+            if self.max_conversations:
+                while len(self.conversations) > self.max_conversations:
+                    self._drop(next(iter(self.conversations)))
+                    self.evicted_lru += 1
+        else:
+            conversation.last_active = time.monotonic()
+            self.conversations.move_to_end(key)
+        return conversation
+    
+    def _drop(self, key: Tuple[str, int]) -> bool:
+        """Forget a conversation and its summary state"""
+        conversation = self.conversations.pop(key, None)
+        self._clear_summary(key)
+        if conversation is None:
+            return False
+        self._live[key[0]] -= 1
+        self._held[key[0]] -= len(conversation)
+        self._held_chars -= conversation.chars
+        self._held_tokens -= conversation.tokens
+        return True
+    
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """
+        Drop conversations idle for longer than idle_ttl
+        
+        Conversations are kept in activity order, so this stops at the first
+        one still in use and costs O(evicted), not O(conversations).
+        
+        Returns:
+            Number of conversations evicted
+        """
+        if not self.idle_ttl:
+            return 0
+        
+        cutoff = (time.monotonic() if now is None else now) - self.idle_ttl
+        evicted = 0
+        while self.conversations:
+            key, conversation = next(iter(self.conversations.items()))
+            if conversation.last_active > cutoff:
+                break
+            self._drop(key)
+            evicted += 1
+        
+        if evicted:
+            self.evicted_idle += evicted
+            logger.debug(f"Evicted {evicted} idle conversations")
+        return evicted
+    
+    async def _sweep_loop(self) -> None:
+        """Periodically evict idle conversations"""
+        interval = min(max(self.idle_ttl / 4, 1.0), 60.0)
+        while True:
+            await asyncio.sleep(interval)
+            self.evict_idle()
+    
+    async def start(self) -> None:
+        """Open the history store and start the background idle sweep"""
+        if self.store is not None:
+            try:
+                await self.store.open()
+            except Exception as e:
+                logger.error(f"History store unavailable, keeping history in memory only: {e}")
+                self.store = None
+        if self.idle_ttl and self._sweep_task is None:
+            self._sweep_task = asyncio.create_task(self._sweep_loop())
+    
+    async def close(self) -> None:
+        """Stop background work and write out buffered history"""
+        if self._sweep_task is not None:
+            self._sweep_task.cancel()
+            self._sweep_task = None
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+        if self.store is not None:
+            await self.store.close()
+    
+    def _clear_summary(self, conversation: Tuple[str, int]) -> None:
+        self.summaries.pop(conversation, None)
+        self._evicted_turns.pop(conversation, None)
+        self._summary_backoff.pop(conversation, None)
+        task = self._summary_tasks.pop(conversation, None)
+        if task is not None:
+            task.cancel()
     
     def get_stats(self) -> Dict[str, Any]:
         """
-        Get statistics about chat history
+        Get statistics about chat history from running totals in O(1)
         
         Returns:
             Dictionary with statistics
         """
-        total_channels = len(self.channel_histories)
-        total_users = len(self.user_histories)
-        total_messages = sum(len(history) for history in self.channel_histories.values())
-        total_user_messages = sum(len(history) for history in self.user_histories.values())
-        
         return {
-            "total_channels": total_channels,
-            "total_users": total_users,
-            "total_channel_messages": total_messages,
-            "total_user_messages": total_user_messages,
-            "max_history_per_conversation": self.max_history
+            "total_channels": self._live["channel"],
+            "total_users": self._live["user"],
+            "total_channel_messages": self._held["channel"],
+            "total_user_messages": self._held["user"],
+            "held_characters": self._held_chars,
+            "held_tokens": self._held_tokens,
+            "messages_added": sum(self.messages_added.values()),
+            **{f"messages_added_{role}": count for role, count in self.messages_added.items()},
+            "characters_added": self.characters_added,
+            "tokens_added": self.tokens_added,
+            "max_history_per_conversation": self.max_history,
+            "live_conversations": len(self.conversations),
+            "max_conversations": self.max_conversations,
+            "evicted_idle": self.evicted_idle,
+            "evicted_lru": self.evicted_lru,
+            **({f"store_{key}": value for key, value in self.store.get_stats().items()}
+               if self.store is not None else {}),
+            "summaries": len(self.summaries),
+            "summaries_in_progress": len(self._summary_tasks),
+            "summary_failures": self.summary_failures,
+            "summary_turns_dropped": self.summary_turns_dropped
         }
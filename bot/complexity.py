@@ -0,0 +1,91 @@
+"""
+Query complexity scoring for AUTO thinking mode
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional
+
+# Indicator -> weight. Strong cues alone trigger thinking; weak cues
+# ("how", "why", ...) only do so together with something else.
+_INDICATOR_WEIGHTS: Dict[str, float] = {
+    "explain": 1.0,
+    "analyze": 1.0,
+    "analyse": 1.0,
+    "compare": 1.0,
+    "contrast": 1.0,
+    "research": 1.0,
+    "solve": 1.0,
+    "calculate": 1.0,
+    "debug": 1.0,
+    "design": 1.0,
+    "architecture": 1.0,
+    "prove": 1.0,
+    "derive": 1.0,
+    "step by step": 1.0,
+    "why": 0.5,
+    "how": 0.5,
+    "complex": 0.5,
+    "complicated": 0.5,
+}
+
+# One alternation with word boundaries: a single pass over the text finds
+# every indicator, and "show" or "howdy" no longer count as "how".
+_INDICATOR_PATTERN = re.compile(
+    r"\b(?:"
+    + "|".join(
+        re.escape(word).replace(r"\ ", r"\s+")
+        for word in sorted(_INDICATOR_WEIGHTS, key=len, reverse=True)
+    )
+    + r")\b",
+    re.IGNORECASE,
+)
+
+_CODE_FENCE = "```"
+_LONG_MESSAGE_CHARS = 600
+
+COMPLEX_THRESHOLD = 1.0
+HISTORY_DECAY = 0.35   # weight multiplier per older user turn
+HISTORY_TURNS = 3      # user turns considered, newest first
+
+
+def message_features(content: str) -> float:
+    """
+    Complexity score of a single message
+
+    Each distinct indicator counts once; pasted code and long messages add a
+    little on top.
+    """
+    seen = {re.sub(r"\s+", " ", m.group(0).lower()) for m in _INDICATOR_PATTERN.finditer(content)}
+    score = sum(_INDICATOR_WEIGHTS[word] for word in seen)
+    if _CODE_FENCE in content:
+        score += 0.5
+    if len(content) > _LONG_MESSAGE_CHARS:
+        score += 0.5
+    return score
+
+
+def conversation_score(features_newest_first: Iterable[float]) -> float:
+    """Combine per-turn scores, newest first, with exponentially decaying weights"""
+    score = 0.0
+    weight = 1.0
+    for index, features in enumerate(features_newest_first):
+        if index >= HISTORY_TURNS:
+            break
+        score += features * weight
+        weight *= HISTORY_DECAY
+    return score
+
+
+def is_complex(score: Optional[float], threshold: float = COMPLEX_THRESHOLD) -> bool:
+    """Whether a score is high enough to route the request into thinking mode"""
+    return score is not None and score >= threshold
+
+
+def score_messages(messages: List[Dict[str, str]]) -> float:
+    """Score a raw message list (for callers without cached per-message features)"""
+    user_turns = (
+        message_features(message.get("content") or "")
+        for message in reversed(messages)
+        if message.get("role") == "user"
+    )
+    return conversation_score(user_turns)
@@ -4,6 +4,8 @@ Configuration management for the Discord AI bot
 import os
 from typing import Optional
 
+from bot.tokens import estimate_message_tokens
+
 class BotConfig:
     """Configuration class for bot settings"""
 
@@ -22,18 +24,93 @@ class BotConfig:
         self.sarvam_base_url: str = os.getenv("SARVAM_BASE_URL", "https://api.sarvam.ai/v1/chat/completions")
         self.sarvam_model_name: str = os.getenv("SARVAM_MODEL_NAME", "sarvam-m")
 
+        # Sarvam transport: "sdk" (sarvamai client in a thread) or "http" (native aiohttp)
+        self.sarvam_transport: str = os.getenv("SARVAM_TRANSPORT", "sdk").lower()
+        self.http_pool_limit: int = int(os.getenv("HTTP_POOL_LIMIT", "100"))
+        self.http_pool_limit_per_host: int = int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", "50"))
+        self.http_keepalive_timeout: float = float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "30"))
+        self.http_dns_cache_ttl: int = int(os.getenv("HTTP_DNS_CACHE_TTL", "300"))
+
         # Bot personality and behavior
         self.system_prompt: str = self._get_system_prompt()
         self.max_history_messages: int = int(os.getenv("MAX_HISTORY_MESSAGES", "20"))
         self.max_response_length: int = int(os.getenv("MAX_RESPONSE_LENGTH", "2000"))
+        # Rolling summaries of turns that fall out of the history window
+        self.enable_history_summaries: bool = os.getenv("ENABLE_HISTORY_SUMMARIES", "true").lower() == "true"
+        self.summary_min_turns: int = int(os.getenv("SUMMARY_MIN_TURNS", "6"))
+        # Forget conversations idle this long (seconds, 0 = never) and cap how many are kept (0 = no cap)
+        self.conversation_idle_ttl: float = float(os.getenv("CONVERSATION_IDLE_TTL", "21600"))
+        self.max_conversations: int = int(os.getenv("MAX_CONVERSATIONS", "10000"))
+        # Persistent chat history (disabled when the path is empty); writes are batched this often
+        self.history_db_path: str = os.getenv("HISTORY_DB_PATH", "")
+        self.history_flush_interval: float = float(os.getenv("HISTORY_FLUSH_INTERVAL", "1.0"))
+        # Model context window shared by system prompt, history and reply (0 = count-only history)
+        self.context_window_tokens: int = int(os.getenv("CONTEXT_WINDOW_TOKENS", "8192"))
+
+        # AUTO thinking mode: minimum complexity score that enables thinking
+        self.complexity_threshold: float = float(os.getenv("COMPLEXITY_THRESHOLD", "1.0"))
+
+        # Streaming replies (progressive message edits)
+        self.stream_responses: bool = os.getenv("STREAM_RESPONSES", "false").lower() == "true"
+        self.stream_edit_interval: float = float(os.getenv("STREAM_EDIT_INTERVAL", "1.0"))
 
         # Fun features
         self.enable_auto_reactions: bool = os.getenv("ENABLE_AUTO_REACTIONS", "true").lower() == "true"
         self.daily_greeting: bool = os.getenv("DAILY_GREETING", "false").lower() == "true"
 
+        # Response cache
+        self.cache_max_bytes: int = int(os.getenv("CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+        self.cache_policy: str = os.getenv("CACHE_POLICY", "lru").lower()
+        # Expired replies are kept this long to answer while upstream is down
+        self.cache_stale_grace: float = float(os.getenv("CACHE_STALE_GRACE", "3600"))
+
+        # Persistent response cache tier (disabled when the path is empty)
+        self.disk_cache_path: str = os.getenv("DISK_CACHE_PATH", "")
+        self.disk_cache_compact_interval: float = float(os.getenv("DISK_CACHE_COMPACT_INTERVAL", "600"))
+        self.disk_cache_warm_entries: int = int(os.getenv("DISK_CACHE_WARM_ENTRIES", "500"))
+
+        # Adaptive upstream concurrency (AIMD)
+        self.limiter_initial: int = int(os.getenv("LIMITER_INITIAL", "10"))
+        self.limiter_min: int = int(os.getenv("LIMITER_MIN", "1"))
+        self.limiter_max: int = int(os.getenv("LIMITER_MAX", "64"))
+        self.limiter_latency_target: float = float(os.getenv("LIMITER_LATENCY_TARGET", "15.0"))
+
+        # Rate limiting (token buckets refilled over RATE_LIMIT_WINDOW seconds; 0 disables a level)
+        self.rate_limit_requests: int = int(os.getenv("RATE_LIMIT_REQUESTS", "10"))
+        self.rate_limit_window: float = float(os.getenv("RATE_LIMIT_WINDOW", "60"))
+        self.rate_limit_guild_requests: int = int(os.getenv("RATE_LIMIT_GUILD_REQUESTS", "30"))
+        self.rate_limit_global_requests: int = int(os.getenv("RATE_LIMIT_GLOBAL_REQUESTS", "120"))
+        self.rate_limit_max_wait: float = float(os.getenv("RATE_LIMIT_MAX_WAIT", "5.0"))
+
+        # Hedged requests (duplicate slow calls; HEDGE_BUDGET_RATIO caps the extra load)
+        self.hedge_enabled: bool = os.getenv("HEDGE_ENABLED", "false").lower() == "true"
+        self.hedge_percentile: float = float(os.getenv("HEDGE_PERCENTILE", "95"))
+        self.hedge_budget_ratio: float = float(os.getenv("HEDGE_BUDGET_RATIO", "0.05"))
+        self.hedge_min_samples: int = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+
         # Retry handling
         self.retry_delay_base: float = float(os.getenv("RETRY_DELAY_BASE", "1.0"))
         self.max_retries: int = int(os.getenv("MAX_RETRIES", "3"))
+        self.retry_max_delay: float = float(os.getenv("RETRY_MAX_DELAY", "20.0"))
+        self.retry_budget_ratio: float = float(os.getenv("RETRY_BUDGET_RATIO", "0.2"))
+        self.circuit_failure_threshold: int = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+        self.circuit_reset_timeout: float = float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30.0"))
+
+        # Prometheus /metrics plus /healthz and /readyz (disabled when the port is 0)
+        self.metrics_host: str = os.getenv("METRICS_HOST", "127.0.0.1")
+        self.metrics_port: int = int(os.getenv("METRICS_PORT", "0"))
+        self.loop_lag_interval: float = float(os.getenv("LOOP_LAG_INTERVAL", "0.5"))
+
+        # Owner-only !profile / !memtrace (reports are uploaded unless an output dir is set)
+        self.profile_max_seconds: float = float(os.getenv("PROFILE_MAX_SECONDS", "300"))
+        self.profile_output_dir: str = os.getenv("PROFILE_OUTPUT_DIR", "")
+
+    def history_token_budget(self) -> Optional[int]:
+        """Tokens left for chat history after the system prompt and reply are reserved"""
+        if self.context_window_tokens <= 0:
+            return None
+        reserved = self.max_response_length + estimate_message_tokens(self.system_prompt)
+        return max(0, self.context_window_tokens - reserved)
 
     def _get_channel_id(self) -> Optional[int]:
         """Get chat channel ID from environment"""
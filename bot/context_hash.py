@@ -0,0 +1,93 @@
+"""
+Order-preserving rolling hashes over conversation histories
+"""
+
+import hashlib
+from collections import deque
+from typing import Dict, Iterable, NamedTuple
+
+# Polynomial hash over per-message digests, modulo the Mersenne prime 2^61 - 1
+_MOD = (1 << 61) - 1
+_BASE = 0x5BD1E995_3C6EF372 % _MOD
+
+
+def message_digest(role: str, content: str) -> int:
+    """Digest a single (role, content) turn into a field element"""
+    raw = hashlib.blake2b(f"{role}\x00{content}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(raw, "big") % _MOD
+
+
+class ContextKey(NamedTuple):
+    """Hash of an ordered message sequence plus its length"""
+    value: int
+    length: int
+
+    def prepend(self, digest: int) -> "ContextKey":
+        """Key of the same sequence with one message inserted at the front"""
+        return ContextKey(
+            (digest * pow(_BASE, self.length, _MOD) + self.value) % _MOD,
+            self.length + 1,
+        )
+
+    def __str__(self) -> str:
+        return f"{self.value:016x}.{self.length}"
+
+
+def hash_messages(messages: Iterable[Dict[str, str]]) -> ContextKey:
+    """Hash a message list from scratch (same result as the rolling hash)"""
+    value = 0
+    length = 0
+    for message in messages:
+        digest = message_digest(str(message.get("role")), str(message.get("content")))
+        value = (value * _BASE + digest) % _MOD
+        length += 1
+    return ContextKey(value, length)
+
+
+class RollingConversationHash:
+    """
+    Rolling hash over a bounded window of messages.
+
+    Keeps the cumulative prefix hash after each message, so appending,
+    sliding the window and hashing any suffix of it are all O(1).
+    """
+
+    __slots__ = ("_prefixes", "_base")
+
+    def __init__(self, maxlen: int):
+        self._prefixes: deque = deque(maxlen=maxlen)
+        # Prefix hash of everything that has already slid out of the window
+        self._base = 0
+
+    def __len__(self) -> int:
+        return len(self._prefixes)
+
+    def append(self, digest: int) -> None:
+        """Add the digest of a newly appended message"""
+        prefixes = self._prefixes
+        last = prefixes[-1] if prefixes else self._base
+        if len(prefixes) == prefixes.maxlen:
+            self._base = prefixes[0]
+        prefixes.append((last * _BASE + digest) % _MOD)
+
+    def clear(self) -> None:
+        self._prefixes.clear()
+        self._base = 0
+
+    def key(self, start: int = 0) -> ContextKey:
+        """
+        Key of the window suffix beginning at index start
+
+        Args:
+            start: Number of oldest messages in the window to leave out
+
+        Returns:
+            ContextKey equal to hash_messages() over the same messages
+        """
+        prefixes = self._prefixes
+        length = len(prefixes) - start
+        if length <= 0:
+            return ContextKey(0, 0)
+        before = self._base if start == 0 else prefixes[start - 1]
+        value = (prefixes[-1] - before * pow(_BASE, length, _MOD)) % _MOD
+        return ContextKey(value, length)
@@ -0,0 +1,90 @@
+"""
+Read-only, zero-copy views of conversation context for API calls
+"""
+
+from collections.abc import Sequence
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+
+class FrozenMessage(dict):
+    """
+    Chat completions message that cannot be changed once built
+
+    Still a real dict, so JSON encoders and SDKs accept it unchanged.
+    Copies (copy/deepcopy/pickle) come back as plain, mutable dicts.
+    """
+
+    __slots__ = ()
+
+    def _read_only(self, *args: Any, **kwargs: Any) -> None:
+        raise TypeError(f"{type(self).__name__} is read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+
+class ContextView(Sequence):
+    """
+    Immutable window over a message list, optionally preceded by prefix messages
+
+    The view only stores the list and the [start, stop) bounds, so building
+    one, prepending the system prompt and slicing are all O(1) and never copy
+    messages. Appending to the underlying list later does not change views
+    that already exist.
+    """
+
+    __slots__ = ("_items", "_start", "_stop", "_prefix")
+
+    def __init__(
+        self,
+        items: Sequence = (),
+        start: int = 0,
+        stop: Optional[int] = None,
+        prefix: Tuple[Dict[str, str], ...] = (),
+    ):
+        self._items = items
+        self._start = start
+        self._stop = len(items) if stop is None else stop
+        self._prefix = prefix
+
+    def with_prefix(self, *messages: Dict[str, str]) -> "ContextView":
+        """Same view with messages placed in front"""
+        return ContextView(self._items, self._start, self._stop, messages + self._prefix)
+
+    def __len__(self) -> int:
+        return len(self._prefix) + self._stop - self._start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            begin, end, step = index.indices(len(self))
+            skip = begin - len(self._prefix)
+            if step == 1 and skip >= 0:
+                return ContextView(self._items, self._start + skip, self._start + max(skip, end - len(self._prefix)))
+            return tuple(self[i] for i in range(begin, end, step))
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("context index out of range")
+        if index < len(self._prefix):
+            return self._prefix[index]
+        return self._items[self._start + index - len(self._prefix)]
+
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        yield from self._prefix
+        items = self._items
+        for index in range(self._start, self._stop):
+            yield items[index]
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, (ContextView, list, tuple)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"ContextView({list(self)!r})"
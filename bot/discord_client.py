@@ -1,16 +1,21 @@
 import logging
 import asyncio
 import random
-from typing import Optional
+from typing import AsyncIterator, Optional
 import io
 import textwrap
+import time
 
 import discord
 from discord.ext import commands
 
 from bot.config import BotConfig
-from bot.sarvam_client import SarvamClient
+from bot.sarvam_client import ResponseType, SarvamClient, ServiceNotice
 from bot.chat_manager import ChatManager
+from bot.history_store import HistoryStore
+from bot.metrics import metrics
+from bot.metrics_server import MetricsServer
+from bot.scheduler import Priority
 from bot.store import ChatChannelMemory
 
 # ---------------------------------------------------------------------------
@@ -46,7 +51,69 @@ async def _safe_send(channel: discord.TextChannel, content: str, *, wrap_in_code
         break_on_hyphens=False,
         replace_whitespace=False,
     ):
-        await channel.send(f"{prefix}{chunk}{suffix}")
+        with metrics.timer("send_chunk"):
+            await channel.send(f"{prefix}{chunk}{suffix}")
+
+
+def _split_point(text: str, limit: int) -> int:
+    """Index at which to cut text so the head fits in limit, preferring line/word breaks"""
+    cut = text.rfind("\n", 0, limit)
+    if cut <= 0:
+        cut = text.rfind(" ", 0, limit)
+    return cut if cut > 0 else limit
+
+
+async def _stream_send(
+    channel: discord.abc.Messageable,
+    fragments: AsyncIterator[str],
+    *,
+    edit_interval: float = 1.0,
+) -> str:
+    """
+    Post a streamed reply: send the first fragment as soon as it arrives, then
+    edit the message at most once per edit_interval, starting a new message
+    whenever the current one would exceed Discord's length limit.
+
+    Returns the full streamed text, as a ServiceNotice if that is what was
+    streamed.
+    """
+    text = ""
+    notice = False
+    current = None          # message currently being edited
+    current_start = 0       # offset in text where the current message begins
+    shown = ""              # content last sent/edited into current
+    last_edit = 0.0
+
+    async for fragment in fragments:
+        notice = notice or isinstance(fragment, ServiceNotice)
+        text += fragment
+        pending = text[current_start:]
+
+        # roll over to a new message at the 2000-char limit
+        while len(pending) > MAX_DISCORD_LEN:
+            cut = _split_point(pending, MAX_DISCORD_LEN)
+            head = pending[:cut]
+            if current is None:
+                await channel.send(head)
+            elif head != shown:
+                await current.edit(content=head)
+            current, shown = None, ""
+            current_start += cut
+            pending = text[current_start:]
+
+        now = time.monotonic()
+        if current is None:
+            if pending.strip():
+                current = await channel.send(pending)
+                shown, last_edit = pending, now
+        elif now - last_edit >= edit_interval and pending != shown:
+            await current.edit(content=pending)
+            shown, last_edit = pending, now
+
+    pending = text[current_start:]
+    if current is not None and pending != shown:
+        await current.edit(content=pending)
+    return ServiceNotice(text) if notice else text
 
 
 class DiscordBot(commands.Bot):
@@ -65,8 +132,22 @@ class DiscordBot(commands.Bot):
         )
 
         self.config = config
-        self.chat_manager = ChatManager(config.max_history_messages)
+        self.chat_manager = ChatManager(
+            config.max_history_messages,
+            token_budget=config.history_token_budget(),
+            summary_min_turns=config.summary_min_turns,
+            idle_ttl=config.conversation_idle_ttl,
+            max_conversations=config.max_conversations,
+            store=HistoryStore(
+                config.history_db_path,
+                keep_messages=config.max_history_messages,
+                flush_interval=config.history_flush_interval,
+            ) if config.history_db_path else None,
+        )
         self.sarvam_client = sarvam_client
+        self.metrics_server: Optional[MetricsServer] = None
+        if config.enable_history_summaries:
+            self.chat_manager.set_summarizer(sarvam_client.summarize_conversation)
 
     # ---------------------------------------------------------------------
     # life‑cycle events
@@ -75,14 +156,32 @@ class DiscordBot(commands.Bot):
     async def setup_hook(self):
         logger.info("Setting up Discord bot…")
 
+        await self.sarvam_client.start()
+        await self.chat_manager.start()
+
+        from bot.admin_commands import AdminCommands
         from bot.chat_commands import FunCommands
         from bot.study_commands import StudyCommands
         await self.add_cog(FunCommands(self))
         await self.add_cog(StudyCommands(self))
+        await self.add_cog(AdminCommands(self))
+
+        if self.config.metrics_port:
+            self.metrics_server = MetricsServer(
+                self,
+                host=self.config.metrics_host,
+                port=self.config.metrics_port,
+                lag_interval=self.config.loop_lag_interval,
+            )
+            await self.metrics_server.start()
 
         logger.info("Discord bot setup complete")
 
     async def close(self):
+        if self.metrics_server is not None:
+            await self.metrics_server.stop()
+        await self.chat_manager.close()
+        await self.sarvam_client.close()
         await super().close()
 
     async def on_ready(self):
@@ -116,7 +215,8 @@ class DiscordBot(commands.Bot):
 
         should_respond = await self._should_respond_to_message(message)
         if should_respond:
-            await self._handle_chat_message(message)
+            with metrics.timer("handle_message"):
+                await self._handle_chat_message(message)
 
     async def _should_respond_to_message(self, message: discord.Message) -> bool:
         if isinstance(message.channel, discord.DMChannel):
@@ -140,26 +240,71 @@ class DiscordBot(commands.Bot):
                     except Exception:
                         pass
 
+                is_dm = isinstance(message.channel, discord.DMChannel)
+
                 # store the user message in history
-                self.chat_manager.add_message(
-                    channel_id=message.channel.id,
-                    user_id=message.author.id,
-                    content=message.content,
-                    role="user",
-                )
+                with metrics.timer("history_load"):
+                    await self.chat_manager.ensure_loaded(
+                        channel_id=message.channel.id, user_id=message.author.id
+                    )
+                with metrics.timer("history_append"):
+                    self.chat_manager.add_message(
+                        channel_id=message.channel.id,
+                        user_id=message.author.id,
+                        content=message.content,
+                        role="user",
+                        dm=is_dm,
+                    )
 
                 # choose history context: per‑user for DMs, per‑channel for guilds
-                if isinstance(message.channel, discord.DMChannel):
-                    context = self.chat_manager.get_conversation_context(
-                        user_id=message.author.id
-                    )
+                if is_dm:
+                    history = {"user_id": message.author.id}
                 else:
-                    context = self.chat_manager.get_conversation_context(
-                        channel_id=message.channel.id
+                    history = {"channel_id": message.channel.id}
+                with metrics.timer("context_build"):
+                    context = self.chat_manager.get_conversation_context(**history)
+                    context_key = self.chat_manager.get_context_key(**history)
+                    complexity = self.chat_manager.get_complexity(**history)
+                requester = {
+                    "guild_id": message.guild.id if message.guild else None,
+                    "user_id": message.author.id,
+                    "priority": Priority.INTERACTIVE,
+                    "complexity": complexity,
+                }
+
+                if self.sarvam_client.response_type is ResponseType.STREAMING:
+                    response = await _stream_send(
+                        message.channel,
+                        self.sarvam_client.stream_response(
+                            context, context_key=context_key, **requester
+                        ),
+                        edit_interval=self.config.stream_edit_interval,
                     )
+                    if isinstance(response, ServiceNotice):
+                        # already shown; not part of the conversation
+                        return
+                    response = response.strip()
+                    if response:
+                        self.chat_manager.add_message(
+                            channel_id=message.channel.id,
+                            user_id=self.user.id,
+                            content=response,
+                            role="assistant",
+                            dm=is_dm,
+                        )
+                        logger.info(
+                            f"Streamed response to {message.author} in {message.channel}"
+                        )
+                        return
+                    await message.channel.send(
+                        "Sorry, I couldn't generate a response right now. Please try again."
+                    )
+                    return
 
                 # get the AI reply
-                response = await self.sarvam_client.generate_response(context)
+                response = await self.sarvam_client.generate_response(
+                    context, context_key=context_key, **requester
+                )
 
                 if response:
                     # determine if it *looks* like code → wrap in fences
@@ -169,6 +314,8 @@ class DiscordBot(commands.Bot):
                     await _safe_send(
                         message.channel, response, wrap_in_code=is_code
                     )
+                    if isinstance(response, ServiceNotice):
+                        return
 
                     # store assistant response in history
                     self.chat_manager.add_message(
@@ -176,6 +323,7 @@ class DiscordBot(commands.Bot):
                         user_id=self.user.id,
                         content=response,
                         role="assistant",
+                        dm=is_dm,
                     )
                     logger.info(
                         f"Responded to message from {message.author} in {message.channel}"
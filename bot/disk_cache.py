@@ -0,0 +1,135 @@
+"""
+Persistent SQLite-backed second tier for the response cache
+"""
+
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from bot.sqlite_worker import SQLiteWorker
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    content TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS responses_expires_at ON responses (expires_at);
+"""
+
+
+class DiskCache(SQLiteWorker):
+    """
+    Response cache stored in SQLite (WAL mode) so it survives restarts.
+
+    Database work runs on the SQLiteWorker thread. Expiry times are
+    wall-clock timestamps so TTLs carry across restarts.
+    """
+
+    SCHEMA = _SCHEMA
+
+    def __init__(self, path: str):
+        super().__init__(path, thread_name_prefix="disk-cache")
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "expired_removed": 0,
+            "warmed": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # blocking helpers (worker thread only)
+    # ------------------------------------------------------------------
+
+    def _get(self, key: str, now: float) -> Optional[Tuple[str, float]]:
+        row = self._conn.execute(
+            "SELECT content, expires_at FROM responses WHERE key = ? AND expires_at > ?",
+            (key, now),
+        ).fetchone()
+        if row is None:
+            return None
+        self._conn.execute("UPDATE responses SET hits = hits + 1 WHERE key = ?", (key,))
+        return row[0], row[1] - now
+
+    def _put(self, key: str, content: str, expires_at: float) -> None:
+        self._conn.execute(
+            "INSERT INTO responses (key, content, expires_at, hits) VALUES (?, ?, ?, 0) "
+            "ON CONFLICT(key) DO UPDATE SET content = excluded.content, "
+            "expires_at = excluded.expires_at",
+            (key, content, expires_at),
+        )
+
+    def _warm(self, limit: int, now: float) -> List[Tuple[str, str, float]]:
+        rows = self._conn.execute(
+            "SELECT key, content, expires_at FROM responses WHERE expires_at > ? "
+            "ORDER BY hits DESC LIMIT ?",
+            (now, limit),
+        ).fetchall()
+        return [(key, content, expires_at - now) for key, content, expires_at in rows]
+
+    def _compact(self, now: float) -> int:
+        removed = self._conn.execute(
+            "DELETE FROM responses WHERE expires_at <= ?", (now,)
+        ).rowcount
+        self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return removed
+
+    def _clear(self) -> None:
+        self._conn.execute("DELETE FROM responses")
+
+    # ------------------------------------------------------------------
+    # async API
+    # ------------------------------------------------------------------
+
+    async def open(self) -> None:
+        """Open (and create if needed) the cache database"""
+        await self._open_database()
+        logger.info(f"Disk cache opened at {self.path}")
+
+    async def get(self, key: str) -> Optional[Tuple[str, float]]:
+        """
+        Look up key
+
+        Returns:
+            (content, remaining TTL in seconds), or None if missing/expired
+        """
+        row = await self._run(self._get, key, time.time())
+        self.stats["hits" if row is not None else "misses"] += 1
+        return row
+
+    async def put(self, key: str, content: str, ttl_seconds: float) -> None:
+        """Store content under key for ttl_seconds"""
+        await self._run(self._put, key, content, time.time() + ttl_seconds)
+        self.stats["writes"] += 1
+
+    async def warm(self, limit: int) -> List[Tuple[str, str, float]]:
+        """
+        Fetch the most frequently hit live entries
+
+        Returns:
+            List of (key, content, remaining TTL in seconds)
+        """
+        rows = await self._run(self._warm, limit, time.time())
+        self.stats["warmed"] += len(rows)
+        return rows
+
+    async def compact(self) -> int:
+        """Delete expired rows and truncate the WAL; returns rows removed"""
+        removed = await self._run(self._compact, time.time())
+        self.stats["expired_removed"] += removed
+        if removed:
+            logger.info(f"Disk cache compaction removed {removed} expired entries")
+        return removed
+
+    async def clear(self) -> None:
+        await self._run(self._clear)
+
+    async def close(self) -> None:
+        await self._close_database()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats)
@@ -0,0 +1,42 @@
+"""
+Latency tracking used to time hedged (duplicate) upstream requests
+"""
+
+import math
+from collections import deque
+from typing import Deque, Optional
+
+
+class LatencyTracker:
+    """Sliding window of recent request latencies with cached percentiles"""
+
+    def __init__(self, window: int = 256, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._sorted: Optional[list] = None
+        self._since_sort = 0
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, latency: float) -> None:
+        self._samples.append(latency)
+        self._since_sort += 1
+        # Re-sorting every few samples is plenty for a percentile estimate
+        if self._since_sort >= 16:
+            self._sorted = None
+
+    def percentile(self, p: float) -> Optional[float]:
+        """
+        Latency at percentile p (0-100) of the window
+
+        Returns:
+            Seconds, or None until min_samples latencies have been seen
+        """
+        if len(self._samples) < self.min_samples:
+            return None
+        if self._sorted is None:
+            self._sorted = sorted(self._samples)
+            self._since_sort = 0
+        index = min(len(self._sorted) - 1, max(0, math.ceil(p / 100 * len(self._sorted)) - 1))
+        return self._sorted[index]
@@ -0,0 +1,171 @@
+"""
+Persistent SQLite-backed store for chat history
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from bot.sqlite_worker import SQLiteWorker
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    conversation_id INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    user_id INTEGER NOT NULL,
+    timestamp REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS messages_conversation ON messages (kind, conversation_id, seq);
+"""
+
+# ("channel"|"user", id), as used by ChatManager
+ConversationKey = Tuple[str, int]
+# (role, content, user_id, timestamp)
+StoredMessage = Tuple[str, str, int, float]
+
+
+class HistoryStore(SQLiteWorker):
+    """
+    Chat history stored in SQLite (WAL mode) so conversations survive restarts.
+
+    append() only buffers the row; buffered rows are written in one
+    transaction per batch on the SQLiteWorker thread, either every
+    flush_interval seconds or as soon as max_batch rows are waiting. Because
+    the worker runs jobs in submission order, a load or delete queued after
+    a flush always sees that flush's rows. Each conversation keeps only its
+    newest keep_messages rows, and nothing is read at startup.
+    """
+
+    SCHEMA = _SCHEMA
+
+    def __init__(self, path: str, keep_messages: int = 20, flush_interval: float = 1.0, max_batch: int = 500):
+        super().__init__(path, thread_name_prefix="history-store")
+        self.keep_messages = keep_messages
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._pending: List[Tuple[str, int, str, str, int, float]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._background: Set[asyncio.Task] = set()
+        self.stats = {
+            "appended": 0,
+            "written": 0,
+            "batches": 0,
+            "write_errors": 0,
+            "loads": 0,
+            "loaded_messages": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # blocking helpers (worker thread only)
+    # ------------------------------------------------------------------
+
+    def _write(self, rows: List[Tuple[str, int, str, str, int, float]]) -> None:
+        conn = self._conn
+        conn.execute("BEGIN")
+        try:
+            conn.executemany(
+                "INSERT INTO messages (kind, conversation_id, role, content, user_id, timestamp) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            # Trim every conversation touched by this batch to its newest rows
+            for kind, conversation_id in {(row[0], row[1]) for row in rows}:
+                conn.execute(
+                    "DELETE FROM messages WHERE kind = ? AND conversation_id = ? AND seq <= ("
+                    "SELECT seq FROM messages WHERE kind = ? AND conversation_id = ? "
+                    "ORDER BY seq DESC LIMIT 1 OFFSET ?)",
+                    (kind, conversation_id, kind, conversation_id, self.keep_messages),
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _load(self, kind: str, conversation_id: int, limit: int) -> List[StoredMessage]:
+        rows = self._conn.execute(
+            "SELECT role, content, user_id, timestamp FROM messages "
+            "WHERE kind = ? AND conversation_id = ? ORDER BY seq DESC LIMIT ?",
+            (kind, conversation_id, limit),
+        ).fetchall()
+        rows.reverse()
+        return rows
+
+    def _delete(self, kind: str, conversation_id: int) -> None:
+        self._conn.execute(
+            "DELETE FROM messages WHERE kind = ? AND conversation_id = ?", (kind, conversation_id)
+        )
+
+    # ------------------------------------------------------------------
+    # async API
+    # ------------------------------------------------------------------
+
+    async def open(self) -> None:
+        """Open (and create if needed) the history database and start the flusher"""
+        await self._open_database()
+        self._flush_task = asyncio.create_task(self._flush_loop())
+        logger.info(f"History store opened at {self.path}")
+
+    def append(self, key: ConversationKey, role: str, content: str, user_id: int, timestamp: float) -> None:
+        """Buffer one message for the next batched write (never blocks)"""
+        self._pending.append((key[0], key[1], role, content, user_id, timestamp))
+        self.stats["appended"] += 1
+        if len(self._pending) >= self.max_batch and self._conn is not None:
+            task = asyncio.get_running_loop().create_task(self.flush())
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+
+    async def flush(self) -> int:
+        """Write all buffered messages in one transaction; returns rows written"""
+        if not self._pending:
+            return 0
+        rows, self._pending = self._pending, []
+        try:
+            await self._run(self._write, rows)
+        except Exception as e:
+            self.stats["write_errors"] += 1
+            logger.warning(f"History store write of {len(rows)} messages failed: {e}")
+            return 0
+        self.stats["written"] += len(rows)
+        self.stats["batches"] += 1
+        return len(rows)
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def load(self, key: ConversationKey, limit: Optional[int] = None) -> List[StoredMessage]:
+        """
+        Fetch the newest messages of one conversation, oldest first
+
+        Returns:
+            List of (role, content, user_id, timestamp)
+        """
+        await self.flush()
+        rows = await self._run(self._load, key[0], key[1], limit or self.keep_messages)
+        self.stats["loads"] += 1
+        self.stats["loaded_messages"] += len(rows)
+        return rows
+
+    async def delete(self, key: ConversationKey) -> None:
+        """Forget one conversation, including messages not written yet"""
+        self._pending = [row for row in self._pending if (row[0], row[1]) != key]
+        await self._run(self._delete, key[0], key[1])
+
+    async def close(self) -> None:
+        """Write what is buffered and close the database"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+        await self.flush()
+        await self._close_database()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "pending": len(self._pending)}
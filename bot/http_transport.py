@@ -0,0 +1,140 @@
+"""
+Native async HTTP transport for the Sarvam chat completions endpoint
+"""
+
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, Optional
+
+import aiohttp
+
+from bot.config import BotConfig
+
+logger = logging.getLogger(__name__)
+
+
+class SarvamAPIError(Exception):
+    """Non-2xx response from the Sarvam API"""
+
+    def __init__(self, status: int, message: str, retry_after: Optional[float] = None):
+        super().__init__(f"Sarvam API returned HTTP {status}: {message}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a delta-seconds Retry-After header (HTTP-dates are ignored)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+class SarvamHTTPTransport:
+    """aiohttp transport sharing one pooled keep-alive session for all requests"""
+
+    def __init__(self, config: BotConfig):
+        self.config = config
+        self.url = config.sarvam_base_url
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _headers(self) -> Dict[str, str]:
+        return {
+            "api-subscription-key": self.config.sarvam_api_key,
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+        }
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Create the shared session lazily so it binds to the running loop"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.config.http_pool_limit,
+                limit_per_host=self.config.http_pool_limit_per_host,
+                keepalive_timeout=self.config.http_keepalive_timeout,
+                ttl_dns_cache=self.config.http_dns_cache_ttl,
+                use_dns_cache=True,
+            )
+            # Overall request deadlines are enforced by SarvamClient; only
+            # bound the connect phase here so a dead host fails fast.
+            timeout = aiohttp.ClientTimeout(total=None, sock_connect=10)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=timeout,
+                headers=self._headers(),
+            )
+            logger.info(
+                f"Opened Sarvam HTTP session (limit={self.config.http_pool_limit}, "
+                f"per_host={self.config.http_pool_limit_per_host})"
+            )
+        return self._session
+
+    async def chat_completions(self, **params: Any) -> Dict[str, Any]:
+        """
+        POST a chat completion request
+
+        Args:
+            **params: Request body, as built by SarvamClient._build_request_params
+
+        Returns:
+            Decoded JSON response (same shape as the SDK's completion object)
+        """
+        session = await self._get_session()
+        async with session.post(self.url, json=params) as resp:
+            if resp.status >= 400:
+                body = await resp.text()
+                raise SarvamAPIError(
+                    resp.status,
+                    body[:500],
+                    retry_after=_parse_retry_after(resp.headers.get("Retry-After")),
+                )
+            return await resp.json(content_type=None)
+
+    async def stream_chat_completions(self, **params: Any) -> AsyncIterator[str]:
+        """
+        POST a streaming chat completion request and yield content deltas
+
+        Args:
+            **params: Request body; "stream" is forced on
+
+        Yields:
+            Text fragments in arrival order (empty deltas are skipped)
+        """
+        session = await self._get_session()
+        headers = {"Accept": "text/event-stream"}
+        async with session.post(self.url, json={**params, "stream": True}, headers=headers) as resp:
+            if resp.status >= 400:
+                body = await resp.text()
+                raise SarvamAPIError(
+                    resp.status,
+                    body[:500],
+                    retry_after=_parse_retry_after(resp.headers.get("Retry-After")),
+                )
+            # Server-sent events: one "data: {json}" line per chunk, "[DONE]" at the end
+            async for raw_line in resp.content:
+                line = raw_line.strip()
+                if not line.startswith(b"data:"):
+                    continue
+                data = line[5:].strip()
+                if data == b"[DONE]":
+                    break
+                try:
+                    chunk = json.loads(data)
+                except ValueError:
+                    logger.warning(f"Skipping malformed stream chunk: {data[:100]!r}")
+                    continue
+                choices = chunk.get("choices") or []
+                if not choices:
+                    continue
+                delta = choices[0].get("delta") or {}
+                content = delta.get("content")
+                if content:
+                    yield content
+
+    async def close(self) -> None:
+        """Close the pooled session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
@@ -0,0 +1,99 @@
+"""
+Adaptive (AIMD) concurrency limiter for upstream requests
+"""
+
+import logging
+import time
+from typing import Any, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit that grows additively while requests succeed within the
+    latency target and shrinks multiplicatively on overload signals
+    (timeouts, HTTP 429 and 5xx). The limiter never queues: RequestScheduler
+    owns the waiting requests and is told whenever a slot may have freed up.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 10,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        latency_target: float = 15.0,
+        backoff_ratio: float = 0.5,
+        decrease_cooldown: float = 1.0,
+    ):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.backoff_ratio = backoff_ratio
+        # One burst of failures should only halve the limit once
+        self.decrease_cooldown = decrease_cooldown
+
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        # Called whenever capacity may have become available
+        self._listeners: List[Callable[[], None]] = []
+
+        self.stats = {
+            "acquired": 0,
+            "increases": 0,
+            "decreases": 0,
+        }
+
+    def has_capacity(self) -> bool:
+        return self.in_flight < int(self.limit)
+
+    def try_acquire(self) -> bool:
+        """Take a slot without waiting; False if the limit is reached"""
+        if not self.has_capacity():
+            return False
+        self.in_flight += 1
+        self.stats["acquired"] += 1
+        return True
+
+    def release(self) -> None:
+        """Return a slot"""
+        self.in_flight -= 1
+        self._notify()
+
+    def add_listener(self, callback: Callable[[], None]) -> None:
+        """Register a callback run whenever a slot may have freed up"""
+        self._listeners.append(callback)
+
+    def _notify(self) -> None:
+        for callback in self._listeners:
+            callback()
+
+    def on_success(self, latency: float) -> None:
+        """Feed back a successful request's latency in seconds"""
+        # Only grow when the current limit is actually being used
+        if latency <= self.latency_target and self.in_flight + 1 >= int(self.limit):
+            if self.limit < self.max_limit:
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+                self.stats["increases"] += 1
+                self._notify()
+
+    def on_overload(self) -> None:
+        """Feed back a timeout, 429 or 5xx"""
+        now = time.monotonic()
+        if now - self._last_decrease < self.decrease_cooldown:
+            return
+        self._last_decrease = now
+        new_limit = max(float(self.min_limit), self.limit * self.backoff_ratio)
+        if new_limit < self.limit:
+            logger.warning(f"Upstream overloaded; concurrency limit {self.limit:.1f} -> {new_limit:.1f}")
+            self.limit = new_limit
+            self.stats["decreases"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "increases": self.stats["increases"],
+            "decreases": self.stats["decreases"],
+        }
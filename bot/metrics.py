@@ -0,0 +1,206 @@
+"""
+Fixed-memory latency histograms for the message handling pipeline
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+# Log-linear buckets in the style of HdrHistogram: values (in microseconds)
+# below 2**SUB_BUCKET_BITS get one bucket each, and every power of two above
+# that is split into 2**SUB_BUCKET_BITS equal sub-buckets, so any recorded
+# value is off by at most ~3%. Values are clamped to MAX_VALUE_US (~71 min).
+SUB_BUCKET_BITS = 5
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+MAX_VALUE_US = (1 << 32) - 1
+BUCKET_COUNT = (MAX_VALUE_US.bit_length() - SUB_BUCKET_BITS + 1) * SUB_BUCKET_COUNT
+
+DEFAULT_PERCENTILES = (50.0, 90.0, 99.0)
+
+
+def _bucket_index(value: int) -> int:
+    if value < SUB_BUCKET_COUNT:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS - 1
+    return (shift + 1) * SUB_BUCKET_COUNT + (value >> shift) - SUB_BUCKET_COUNT
+
+
+def _bucket_bounds(index: int) -> tuple:
+    """Lowest and highest value (inclusive) that map to a bucket"""
+    if index < 2 * SUB_BUCKET_COUNT:
+        return index, index
+    shift = index // SUB_BUCKET_COUNT - 1
+    sub = index % SUB_BUCKET_COUNT + SUB_BUCKET_COUNT
+    return sub << shift, ((sub + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """
+    Latency histogram with fixed memory and bounded relative error
+
+    Histograms with the same layout can be merged by adding bucket counts,
+    which is what makes snapshots from separate runs comparable offline.
+    """
+
+    __slots__ = ("counts", "count", "total_us", "min_us", "max_us")
+
+    def __init__(self):
+        self.counts: List[int] = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total_us = 0
+        self.min_us = 0
+        self.max_us = 0
+
+    def record(self, seconds: float) -> None:
+        """Record one latency sample given in seconds"""
+        value = min(max(int(seconds * 1_000_000), 0), MAX_VALUE_US)
+        self.counts[_bucket_index(value)] += 1
+        if not self.count or value < self.min_us:
+            self.min_us = value
+        if value > self.max_us:
+            self.max_us = value
+        self.count += 1
+        self.total_us += value
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """Add all samples of another histogram into this one"""
+        if not other.count:
+            return
+        for index, n in enumerate(other.counts):
+            if n:
+                self.counts[index] += n
+        self.min_us = other.min_us if not self.count else min(self.min_us, other.min_us)
+        self.max_us = max(self.max_us, other.max_us)
+        self.count += other.count
+        self.total_us += other.total_us
+
+    def percentile(self, p: float) -> Optional[float]:
+        """
+        Value at percentile p (0-100) in seconds, or None with no samples
+
+        Returns the midpoint of the bucket holding the sample, clamped to the
+        observed min/max.
+        """
+        if not self.count:
+            return None
+        rank = max(1, -(-self.count * p // 100))
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                low, high = _bucket_bounds(index)
+                value = min(max((low + high) / 2, self.min_us), self.max_us)
+                return value / 1_000_000
+        return self.max_us / 1_000_000
+
+    def count_at_or_below(self, seconds: float) -> int:
+        """Number of samples whose bucket lies entirely at or below seconds"""
+        return self.cumulative_counts((seconds,))[0]
+
+    def cumulative_counts(self, bounds: Sequence[float]) -> List[int]:
+        """count_at_or_below() for each of the ascending bounds, in one pass over the buckets"""
+        limits = [bound * 1_000_000 for bound in bounds]
+        result: List[int] = []
+        total = 0
+        for index, n in enumerate(self.counts):
+            if not n:
+                continue
+            high = _bucket_bounds(index)[1]
+            while len(result) < len(limits) and high > limits[len(result)]:
+                result.append(total)
+            if len(result) == len(limits):
+                return result
+            total += n
+        result.extend([total] * (len(limits) - len(result)))
+        return result
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total_us / self.count / 1_000_000 if self.count else None
+
+    def summary(self, percentiles=DEFAULT_PERCENTILES) -> Dict[str, Any]:
+        """Count plus mean, max and percentiles in milliseconds"""
+        result: Dict[str, Any] = {"count": self.count}
+        if not self.count:
+            return result
+        result["mean_ms"] = round(self.mean * 1000, 3)
+        for p in percentiles:
+            result[f"p{p:g}_ms"] = round(self.percentile(p) * 1000, 3)
+        result["max_ms"] = round(self.max_us / 1000, 3)
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable form (only non-empty buckets)"""
+        return {
+            "count": self.count,
+            "total_us": self.total_us,
+            "min_us": self.min_us,
+            "max_us": self.max_us,
+            "buckets": {str(i): n for i, n in enumerate(self.counts) if n},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyHistogram":
+        histogram = cls()
+        for index, n in data.get("buckets", {}).items():
+            histogram.counts[int(index)] = n
+        histogram.count = data.get("count", 0)
+        histogram.total_us = data.get("total_us", 0)
+        histogram.min_us = data.get("min_us", 0)
+        histogram.max_us = data.get("max_us", 0)
+        return histogram
+
+
+class MetricsRegistry:
+    """Named latency histograms, created on first use"""
+
+    def __init__(self):
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.started_at = time.time()
+
+    def histogram(self, name: str) -> LatencyHistogram:
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = LatencyHistogram()
+        return histogram
+
+    def observe(self, name: str, seconds: float) -> None:
+        self.histogram(name).record(seconds)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Time the enclosed block (including awaits) into histogram name"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.histogram(name).record(time.perf_counter() - started)
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Per-stage count, mean, p50/p90/p99 and max in milliseconds"""
+        return {name: h.summary() for name, h in sorted(self.histograms.items())}
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Full serializable snapshot for offline comparison (see merge_snapshot)"""
+        return {
+            "version": 1,
+            "sub_bucket_bits": SUB_BUCKET_BITS,
+            "started_at": self.started_at,
+            "taken_at": time.time(),
+            "histograms": {name: h.to_dict() for name, h in self.histograms.items()},
+        }
+
+    def merge_snapshot(self, snapshot: Dict[str, Any]) -> None:
+        """Merge a snapshot produced by snapshot() into this registry"""
+        if snapshot.get("sub_bucket_bits") != SUB_BUCKET_BITS:
+            raise ValueError("Snapshot uses a different histogram layout")
+        for name, data in snapshot.get("histograms", {}).items():
+            self.histogram(name).merge(LatencyHistogram.from_dict(data))
+
+    def reset(self) -> None:
+        self.histograms.clear()
+        self.started_at = time.time()
+
+
+# Shared registry for the whole process
+metrics = MetricsRegistry()
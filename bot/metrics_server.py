@@ -0,0 +1,288 @@
+"""
+Optional HTTP endpoint exposing Prometheus metrics and health checks
+"""
+
+import asyncio
+import logging
+import math
+import time
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+
+from bot.metrics import metrics
+from bot.retry import CircuitState
+
+logger = logging.getLogger(__name__)
+
+# Prometheus histogram buckets (seconds) derived from the latency histograms
+PROMETHEUS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_CIRCUIT_STATE_VALUES = {
+    CircuitState.CLOSED: 0,
+    CircuitState.HALF_OPEN: 1,
+    CircuitState.OPEN: 2,
+}
+
+# Monotonic totals in SarvamClient.get_stats() that are not in SarvamClient.stats
+_CLIENT_COUNTERS = {
+    "cache_hits", "cache_misses", "cache_evictions", "cache_expirations", "cache_stale_hits",
+    "coalesced_requests",
+    "circuit_opened", "circuit_rejected", "circuit_probes_released", "circuit_probes_timed_out",
+    "rate_limit_allowed", "rate_limit_delayed", "rate_limit_rejected", "rate_limit_evicted_buckets",
+    "limiter_increases", "limiter_decreases",
+    "scheduler_deadline_dropped",
+}
+# Every disk cache stat is a running total
+_CLIENT_COUNTER_PREFIXES = ("disk_cache_",)
+
+# Monotonic totals in ChatManager.get_stats()
+_HISTORY_COUNTERS = {
+    "messages_added", "characters_added", "tokens_added",
+    "evicted_idle", "evicted_lru", "summary_failures", "summary_turns_dropped",
+}
+_HISTORY_COUNTER_PREFIXES = ("messages_added_", "store_")
+# Point-in-time values that share a counter prefix
+_HISTORY_GAUGES = {"store_pending"}
+
+
+class EventLoopLagMonitor:
+    """
+    Measure event-loop lag as the overshoot of a periodic sleep
+
+    A blocked loop wakes the sleeper late; the delay is recorded into the
+    "event_loop_lag" histogram and kept as the latest gauge value.
+    """
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.monotonic() - started - self.interval)
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            metrics.observe("event_loop_lag", lag)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+def _sanitize(name: str) -> str:
+    return "".join(c if c.isalnum() or c == "_" else "_" for c in name).lower()
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: Any) -> Optional[float]:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
+
+
+class _Exposition:
+    """Builds a Prometheus text-format (0.0.4) payload"""
+
+    def __init__(self):
+        self.lines: List[str] = []
+        self._declared = set()
+
+    def _declare(self, name: str, kind: str, help_text: str) -> None:
+        if name not in self._declared:
+            self._declared.add(name)
+            self.lines.append(f"# HELP {name} {help_text}")
+            self.lines.append(f"# TYPE {name} {kind}")
+
+    @staticmethod
+    def _labels(labels: Optional[Dict[str, Any]]) -> str:
+        if not labels:
+            return ""
+        inner = ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+        return "{" + inner + "}"
+
+    def sample(
+        self,
+        name: str,
+        kind: str,
+        value: float,
+        help_text: str,
+        labels: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self._declare(name, kind, help_text)
+        self.lines.append(f"{name}{self._labels(labels)} {value:g}")
+
+    def histogram(self, name: str, help_text: str, labels: Dict[str, Any], histogram) -> None:
+        self._declare(name, "histogram", help_text)
+        for bound, count in zip(PROMETHEUS_BUCKETS, histogram.cumulative_counts(PROMETHEUS_BUCKETS)):
+            bucket_labels = {**labels, "le": f"{bound:g}"}
+            self.lines.append(f"{name}_bucket{self._labels(bucket_labels)} {count}")
+        self.lines.append(f'{name}_bucket{self._labels({**labels, "le": "+Inf"})} {histogram.count}')
+        self.lines.append(f"{name}_sum{self._labels(labels)} {histogram.total_us / 1_000_000:g}")
+        self.lines.append(f"{name}_count{self._labels(labels)} {histogram.count}")
+
+    def render(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+class MetricsServer:
+    """
+    Lightweight aiohttp server for /metrics, /healthz and /readyz
+
+    /healthz answers as long as the event loop is serving requests and the
+    bot has not been closed. /readyz additionally requires a live gateway
+    connection and an upstream circuit that is not open.
+    """
+
+    def __init__(self, bot, host: str = "127.0.0.1", port: int = 9090, lag_interval: float = 0.5):
+        self.bot = bot
+        self.host = host
+        self.port = port
+        self.lag_monitor = EventLoopLagMonitor(lag_interval)
+        self._runner: Optional[web.AppRunner] = None
+
+        self.app = web.Application()
+        self.app.router.add_get("/metrics", self.handle_metrics)
+        self.app.router.add_get("/healthz", self.handle_healthz)
+        self.app.router.add_get("/readyz", self.handle_readyz)
+
+    async def start(self) -> None:
+        self.lag_monitor.start()
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        logger.info(f"Metrics server listening on http://{self.host}:{self.port}")
+
+    async def stop(self) -> None:
+        await self.lag_monitor.stop()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    # ------------------------------------------------------------------
+    # health
+    # ------------------------------------------------------------------
+
+    def _gateway_connected(self) -> bool:
+        return (
+            self.bot.is_ready()
+            and not self.bot.is_closed()
+            and math.isfinite(self.bot.latency)
+        )
+
+    def readiness(self) -> Dict[str, Any]:
+        circuit = self.bot.sarvam_client.circuit.state
+        checks = {
+            "gateway": self._gateway_connected(),
+            "upstream_circuit": circuit is not CircuitState.OPEN,
+        }
+        return {
+            "ready": all(checks.values()),
+            "checks": checks,
+            "circuit_state": circuit.value,
+        }
+
+    async def handle_healthz(self, request: web.Request) -> web.Response:
+        alive = not self.bot.is_closed()
+        return web.json_response(
+            {"status": "ok" if alive else "closed", "event_loop_lag_seconds": self.lag_monitor.last_lag},
+            status=200 if alive else 503,
+        )
+
+    async def handle_readyz(self, request: web.Request) -> web.Response:
+        result = self.readiness()
+        return web.json_response(result, status=200 if result["ready"] else 503)
+
+    # ------------------------------------------------------------------
+    # metrics
+    # ------------------------------------------------------------------
+
+    def render_metrics(self) -> str:
+        out = _Exposition()
+        client = self.bot.sarvam_client
+        client_stats = client.get_stats()
+        counters = set(client.stats) - {"last_ttft_ms"} | _CLIENT_COUNTERS
+
+        for key, value in client_stats.items():
+            number = _number(value)
+            if number is None:
+                continue
+            if key in counters or key.startswith(_CLIENT_COUNTER_PREFIXES):
+                out.sample(f"sarvam_{_sanitize(key)}_total", "counter", number, f"Sarvam client {key}")
+            else:
+                out.sample(f"sarvam_{_sanitize(key)}", "gauge", number, f"Sarvam client {key}")
+
+        cache_stats = client.response_cache.get_stats()
+        lookups = cache_stats["hits"] + cache_stats["misses"]
+        out.sample(
+            "sarvam_cache_hit_ratio", "gauge",
+            cache_stats["hits"] / lookups if lookups else 0.0,
+            "Response cache hit ratio since start",
+        )
+        for priority, depth in client.scheduler.get_stats()["queued_by_priority"].items():
+            out.sample(
+                "sarvam_scheduler_queued", "gauge", depth,
+                "Requests waiting for an upstream slot", {"priority": priority},
+            )
+        out.sample(
+            "sarvam_circuit_state", "gauge", _CIRCUIT_STATE_VALUES[client.circuit.state],
+            "Upstream circuit state (0 closed, 1 half-open, 2 open)",
+        )
+
+        for key, value in self.bot.chat_manager.get_stats().items():
+            number = _number(value)
+            if number is None:
+                continue
+            if key not in _HISTORY_GAUGES and (
+                key in _HISTORY_COUNTERS or key.startswith(_HISTORY_COUNTER_PREFIXES)
+            ):
+                out.sample(f"chat_history_{_sanitize(key)}_total", "counter", number, f"Chat history {key}")
+            else:
+                out.sample(f"chat_history_{_sanitize(key)}", "gauge", number, f"Chat history {key}")
+
+        latency = self.bot.latency
+        out.sample(
+            "discord_gateway_latency_seconds", "gauge",
+            latency if math.isfinite(latency) else -1,
+            "Gateway heartbeat latency (-1 when not connected)",
+        )
+        out.sample("discord_guilds", "gauge", len(self.bot.guilds), "Guilds the bot is in")
+        out.sample("discord_ready", "gauge", int(self._gateway_connected()), "Gateway connected and ready")
+        out.sample(
+            "event_loop_lag_seconds", "gauge", self.lag_monitor.last_lag,
+            "Latest event loop lag measurement",
+        )
+        out.sample(
+            "event_loop_lag_max_seconds", "gauge", self.lag_monitor.max_lag,
+            "Largest event loop lag seen since start",
+        )
+
+        for stage, histogram in sorted(metrics.histograms.items()):
+            out.histogram(
+                "pipeline_stage_seconds", "Latency per message pipeline stage",
+                {"stage": stage}, histogram,
+            )
+        return out.render()
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        return web.Response(
+            body=self.render_metrics().encode("utf-8"),
+            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+        )
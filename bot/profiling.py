@@ -0,0 +1,209 @@
+"""
+On-demand sampling CPU profiler and allocation tracer for the live process
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Frames from these files are noise in allocation reports
+_TRACE_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+)
+
+
+def _short_path(filename: str) -> str:
+    """Path relative to the working directory when inside it, else the last two parts"""
+    try:
+        relative = os.path.relpath(filename)
+    except ValueError:
+        relative = filename
+    if relative.startswith(".."):
+        relative = os.path.join(*filename.replace("\\", "/").split("/")[-2:])
+    return relative
+
+
+class SamplingProfiler:
+    """
+    Statistical CPU profiler for one thread (normally the event loop)
+
+    A daemon thread reads the target thread's current stack through
+    sys._current_frames() every interval. Nothing is installed in the
+    interpreter, so the profiled code runs unchanged and there is no cost
+    at all while the profiler is stopped.
+    """
+
+    def __init__(self, interval: float = 0.005, max_depth: int = 64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples = 0
+        self.idle_samples = 0
+        self.self_counts: Counter = Counter()
+        self.total_counts: Counter = Counter()
+        self.stacks: Counter = Counter()
+        self.started_at: Optional[float] = None
+        self.stopped_at: Optional[float] = None
+        self._labels: Dict[object, str] = {}
+        self._target: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, thread_id: Optional[int] = None) -> None:
+        """Start sampling thread_id (default: the calling thread)"""
+        if self.running:
+            raise RuntimeError("Profiler is already running")
+        self._target = thread_id or threading.get_ident()
+        self._stop.clear()
+        self.started_at = time.monotonic()
+        self.stopped_at = None
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        logger.info(f"Sampling profiler started (interval={self.interval * 1000:.1f} ms)")
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.stopped_at = time.monotonic()
+        logger.info(f"Sampling profiler stopped after {self.samples} samples")
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            if frame is None or self._target == own:
+                break
+            stack: List[str] = []
+            while frame is not None and len(stack) < self.max_depth:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            del frame
+            self.samples += 1
+            leaf = stack[0]
+            # an event loop with nothing to do sits in the selector
+            if leaf.startswith(("select ", "poll ", "_run_once ")) and "selectors.py" in leaf:
+                self.idle_samples += 1
+            self.self_counts[leaf] += 1
+            for label in set(stack):
+                self.total_counts[label] += 1
+            self.stacks[";".join(reversed(stack))] += 1
+
+    def report(self, top: int = 30) -> str:
+        """Plain-text report: most sampled functions by self and inclusive time"""
+        elapsed = ((self.stopped_at or time.monotonic()) - (self.started_at or time.monotonic()))
+        lines = [
+            f"Sampling profile: {self.samples} samples over {elapsed:.1f}s "
+            f"(interval {self.interval * 1000:.1f} ms)",
+            f"Idle in the event loop selector: {self.idle_samples} samples "
+            f"({self.idle_samples / self.samples * 100 if self.samples else 0:.1f}%)",
+            "",
+        ]
+        for title, counts in (("Top functions by self samples", self.self_counts),
+                              ("Top functions by inclusive samples", self.total_counts)):
+            lines.append(title)
+            lines.append(f"{'samples':>8} {'%':>6}  function")
+            for label, count in counts.most_common(top):
+                share = count / self.samples * 100 if self.samples else 0
+                lines.append(f"{count:8d} {share:6.1f}  {label}")
+            lines.append("")
+        return "\n".join(lines)
+
+    def folded(self) -> str:
+        """Collapsed stacks ("a;b;c count" per line) for flame graph tools"""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + "\n"
+
+
+class AllocationTracer:
+    """
+    tracemalloc wrapper that keeps a baseline and the previous snapshot
+
+    Tracing only runs between start() and stop(); while stopped the
+    interpreter does no extra bookkeeping.
+    """
+
+    def __init__(self):
+        self.baseline: Optional[tracemalloc.Snapshot] = None
+        self.previous: Optional[tracemalloc.Snapshot] = None
+        self.started_here = False
+
+    @property
+    def running(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = 1) -> None:
+        if tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is already tracing")
+        tracemalloc.start(frames)
+        self.started_here = True
+        self.baseline = self._take()
+        self.previous = self.baseline
+        logger.info(f"Allocation tracing started ({frames} frame(s) per traceback)")
+
+    def stop(self) -> None:
+        if self.started_here and tracemalloc.is_tracing():
+            tracemalloc.stop()
+            logger.info("Allocation tracing stopped")
+        self.started_here = False
+        self.baseline = self.previous = None
+
+    @staticmethod
+    def _take() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(_TRACE_FILTERS)
+
+    @staticmethod
+    def _format_stats(stats, top: int, diff: bool) -> List[str]:
+        lines = []
+        for stat in stats[:top]:
+            frame = stat.traceback[0]
+            where = f"{_short_path(frame.filename)}:{frame.lineno}"
+            if diff:
+                lines.append(
+                    f"{stat.size_diff / 1024:+10.1f} KiB {stat.count_diff:+9d} blocks  "
+                    f"(now {stat.size / 1024:.1f} KiB)  {where}"
+                )
+            else:
+                lines.append(f"{stat.size / 1024:10.1f} KiB {stat.count:9d} blocks  {where}")
+        return lines
+
+    def snapshot_report(self, top: int = 25) -> str:
+        """Top allocation sites now, plus growth since the previous snapshot and the baseline"""
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is not tracing")
+        current = self._take()
+        traced, peak = tracemalloc.get_traced_memory()
+        lines = [
+            f"Traced memory: {traced / 1024 / 1024:.2f} MiB (peak {peak / 1024 / 1024:.2f} MiB)",
+            "",
+            "Top allocation sites",
+            *self._format_stats(current.statistics("lineno"), top, diff=False),
+        ]
+        if self.previous is not None:
+            lines += ["", "Change since previous snapshot",
+                      *self._format_stats(current.compare_to(self.previous, "lineno"), top, diff=True)]
+        if self.baseline is not None and self.baseline is not self.previous:
+            lines += ["", "Change since tracing started",
+                      *self._format_stats(current.compare_to(self.baseline, "lineno"), top, diff=True)]
+        self.previous = current
+        return "\n".join(lines) + "\n"
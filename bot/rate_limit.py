@@ -0,0 +1,188 @@
+"""
+Hierarchical token-bucket rate limiting (global, per guild, per user)
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitExceeded(Exception):
+    """Request would have to wait longer than allowed for a token"""
+
+    def __init__(self, scope: str, retry_after: float):
+        super().__init__(f"Rate limit exceeded ({scope}); retry in {retry_after:.1f}s")
+        self.scope = scope
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Lazily refilled token bucket"""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def refill(self, now: float) -> None:
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def wait_time(self, now: float, cost: float = 1.0) -> float:
+        """Seconds until cost tokens are available (0 if they already are)"""
+        self.refill(now)
+        if self.tokens >= cost:
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+
+class HierarchicalRateLimiter:
+    """
+    A request must take one token from the global bucket, its guild's bucket
+    and its user's bucket. Buckets are created on first use and dropped once
+    idle, so state stays O(active users + active guilds).
+    """
+
+    def __init__(
+        self,
+        user_requests: int,
+        guild_requests: int,
+        global_requests: int,
+        window_seconds: float,
+        max_wait: float = 5.0,
+        idle_ttl: float = 600.0,
+    ):
+        self.window = window_seconds
+        self.user_requests = user_requests
+        self.guild_requests = guild_requests
+        self.max_wait = max_wait
+        # Idle buckets are full again after one window, so forgetting them is free
+        self.idle_ttl = max(idle_ttl, window_seconds)
+
+        now = time.monotonic()
+        self._global: Optional[TokenBucket] = (
+            TokenBucket(global_requests / window_seconds, global_requests, now)
+            if global_requests > 0 else None
+        )
+        # Ordered by last use so idle buckets are at the front
+        self._guilds: "OrderedDict[int, TokenBucket]" = OrderedDict()
+        self._users: "OrderedDict[int, TokenBucket]" = OrderedDict()
+
+        self.stats = {
+            "allowed": 0,
+            "delayed": 0,
+            "rejected": 0,
+            "evicted_buckets": 0,
+        }
+
+    def _bucket(
+        self,
+        table: "OrderedDict[int, TokenBucket]",
+        key: int,
+        requests: int,
+        now: float,
+    ) -> TokenBucket:
+        bucket = table.get(key)
+        if bucket is None:
+            bucket = TokenBucket(requests / self.window, requests, now)
+            table[key] = bucket
+        else:
+            table.move_to_end(key)
+        return bucket
+
+    def _evict_idle(self, now: float) -> None:
+        for table in (self._guilds, self._users):
+            while table:
+                key, bucket = next(iter(table.items()))
+                if now - bucket.updated < self.idle_ttl:
+                    break
+                del table[key]
+                self.stats["evicted_buckets"] += 1
+
+    def _buckets_for(
+        self,
+        guild_id: Optional[int],
+        user_id: Optional[int],
+        now: float,
+    ) -> List[Tuple[str, TokenBucket]]:
+        buckets = []
+        if self._global is not None:
+            buckets.append(("global", self._global))
+        if guild_id is not None and self.guild_requests > 0:
+            buckets.append(("guild", self._bucket(self._guilds, guild_id, self.guild_requests, now)))
+        if user_id is not None and self.user_requests > 0:
+            buckets.append(("user", self._bucket(self._users, user_id, self.user_requests, now)))
+        return buckets
+
+    def try_acquire(
+        self,
+        guild_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+    ) -> Tuple[float, str]:
+        """
+        Take one token from every applicable bucket if all have one
+
+        Returns:
+            (0.0, "") on success, otherwise (seconds to wait, limiting scope)
+        """
+        now = time.monotonic()
+        self._evict_idle(now)
+        buckets = self._buckets_for(guild_id, user_id, now)
+
+        wait, scope = 0.0, ""
+        for name, bucket in buckets:
+            bucket_wait = bucket.wait_time(now)
+            if bucket_wait > wait:
+                wait, scope = bucket_wait, name
+        if wait > 0:
+            return wait, scope
+
+        for _, bucket in buckets:
+            bucket.tokens -= 1
+        return 0.0, ""
+
+    async def acquire(
+        self,
+        guild_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+        max_wait: Optional[float] = None,
+    ) -> None:
+        """
+        Wait (up to max_wait seconds) for a token from every applicable bucket
+
+        Raises:
+            RateLimitExceeded: if the wait would exceed the deadline
+        """
+        max_wait = self.max_wait if max_wait is None else max_wait
+        deadline = time.monotonic() + max_wait
+        delayed = False
+
+        while True:
+            wait, scope = self.try_acquire(guild_id, user_id)
+            if wait == 0:
+                self.stats["allowed"] += 1
+                self.stats["delayed"] += delayed
+                return
+            if time.monotonic() + wait > deadline:
+                self.stats["rejected"] += 1
+                logger.info(
+                    f"Rate limited ({scope}) guild={guild_id} user={user_id}; retry in {wait:.1f}s"
+                )
+                raise RateLimitExceeded(scope, wait)
+            delayed = True
+            await asyncio.sleep(wait)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "guild_buckets": len(self._guilds),
+            "user_buckets": len(self._users),
+        }
@@ -0,0 +1,215 @@
+"""
+Retry policy, retry budget and circuit breaker for upstream calls
+"""
+
+import asyncio
+import logging
+import random
+import time
+from enum import Enum
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Transport-level failures from aiohttp and httpx (used by the sarvamai SDK),
+# matched by name so neither library has to be imported here
+_TRANSIENT_ERROR_NAMES = {
+    "ClientConnectionError",
+    "ClientPayloadError",
+    "ServerDisconnectedError",
+    "TransportError",
+    "RemoteProtocolError",
+}
+
+_RETRYABLE_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+
+def error_status(error: BaseException) -> Optional[int]:
+    """HTTP status carried by an API error, if any"""
+    status = getattr(error, "status", None)
+    if status is None:
+        # sarvamai SDK errors carry the HTTP status as status_code
+        status = getattr(error, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+class RetryPolicy:
+    """Classifies errors and computes decorrelated-jitter backoff delays"""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 1.0, max_delay: float = 20.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def is_retryable(self, error: BaseException) -> bool:
+        """Timeouts, connection failures, 408/425/429 and 5xx are worth retrying"""
+        if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+            return True
+        status = error_status(error)
+        if status is not None:
+            return status in _RETRYABLE_STATUSES
+        return any(cls.__name__ in _TRANSIENT_ERROR_NAMES for cls in type(error).__mro__)
+
+    def server_hint(self, error: BaseException) -> Optional[float]:
+        """Delay requested by the server via Retry-After, if any"""
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after is not None:
+            return float(retry_after)
+        headers = getattr(error, "headers", None)
+        if headers:
+            try:
+                return max(0.0, float(headers.get("retry-after") or headers.get("Retry-After")))
+            except (TypeError, ValueError):
+                return None
+        return None
+
+    def next_delay(self, previous_delay: float, error: Optional[BaseException] = None) -> float:
+        """
+        Decorrelated jitter: uniform between base and 3x the previous delay,
+        capped at max_delay, and never shorter than a server Retry-After hint
+        """
+        delay = min(self.max_delay, random.uniform(self.base_delay, max(self.base_delay, previous_delay * 3)))
+        hint = self.server_hint(error) if error is not None else None
+        if hint is not None:
+            delay = max(delay, min(hint, self.max_delay))
+        return delay
+
+
+class RetryBudget:
+    """
+    Caps retries to a fraction of request volume so an outage cannot
+    multiply upstream load. Each request deposits ratio tokens, each retry
+    spends one; a small per-second allowance keeps low-traffic retries alive.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_per_second: float = 0.5, max_tokens: float = 20.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.max_tokens, self.tokens + (now - self._updated) * self.min_per_second)
+        self._updated = now
+
+    def record_request(self) -> None:
+        self._refill()
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        """Take one retry token; False if the budget is exhausted"""
+        self._refill()
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+
+class CircuitState(Enum):
+    """Circuit breaker state enumeration"""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Upstream is considered down; the call was not attempted"""
+
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive retryable failures, fails fast
+    for reset_timeout seconds, then lets a single probe through (half-open)
+    and closes again once it succeeds. A probe that ends without an outcome
+    must be handed back with release_probe(); one that has not reported
+    within probe_timeout seconds is given up on and another may start.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, probe_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.probe_timeout = probe_timeout
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_started = 0.0
+        self.stats = {
+            "opened": 0,
+            "rejected": 0,
+            "probes_released": 0,
+            "probes_timed_out": 0,
+        }
+
+    @property
+    def state(self) -> CircuitState:
+        if (
+            self._state is CircuitState.OPEN
+            and time.monotonic() - self._opened_at >= self.reset_timeout
+        ):
+            self._state = CircuitState.HALF_OPEN
+            self._probe_in_flight = False
+        elif (
+            self._state is CircuitState.HALF_OPEN
+            and self._probe_in_flight
+            and time.monotonic() - self._probe_started >= self.probe_timeout
+        ):
+            logger.warning(f"Sarvam circuit probe gave no outcome within {self.probe_timeout:.0f}s")
+            self.stats["probes_timed_out"] += 1
+            self._probe_in_flight = False
+        return self._state
+
+    @property
+    def is_open(self) -> bool:
+        """True while requests are being failed fast"""
+        state = self.state
+        return state is CircuitState.OPEN or (
+            state is CircuitState.HALF_OPEN and self._probe_in_flight
+        )
+
+    def allow_request(self) -> bool:
+        """Whether a call may go upstream now (claims the half-open probe)"""
+        state = self.state
+        if state is CircuitState.CLOSED:
+            return True
+        if state is CircuitState.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            self._probe_started = time.monotonic()
+            return True
+        self.stats["rejected"] += 1
+        return False
+
+    def release_probe(self) -> None:
+        """Hand back a half-open probe that ended (cancelled, timed out in a queue) without an outcome"""
+        if self._state is CircuitState.HALF_OPEN and self._probe_in_flight:
+            self._probe_in_flight = False
+            self.stats["probes_released"] += 1
+
+    def record_success(self) -> None:
+        if self._state is not CircuitState.CLOSED:
+            logger.info("Sarvam circuit closed")
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._state is CircuitState.HALF_OPEN or self._failures >= self.failure_threshold:
+            if self._state is not CircuitState.OPEN:
+                logger.warning(
+                    f"Sarvam circuit opened after {self._failures} failures; "
+                    f"failing fast for {self.reset_timeout:.0f}s"
+                )
+                self.stats["opened"] += 1
+            self._state = CircuitState.OPEN
+            self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state.value,
+            "consecutive_failures": self._failures,
+            **self.stats,
+        }
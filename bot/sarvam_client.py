@@ -1,14 +1,25 @@
 import logging
 import asyncio
-import hashlib
+import math
 import time
 from functools import lru_cache
 from sarvamai import SarvamAI
+from bot.cache import ResponseCache
+from bot.complexity import is_complex, score_messages
 from bot.config import BotConfig
-from typing import List, Dict, Optional, Tuple, Any
+from bot.context_hash import ContextKey, hash_messages, message_digest
+from bot.context_view import ContextView, FrozenMessage
+from bot.disk_cache import DiskCache
+from bot.hedging import LatencyTracker
+from bot.http_transport import SarvamHTTPTransport
+from bot.limiter import AdaptiveLimiter
+from bot.metrics import metrics
+from bot.rate_limit import HierarchicalRateLimiter, RateLimitExceeded
+from bot.retry import CircuitBreaker, CircuitOpenError, CircuitState, RetryBudget, RetryPolicy, error_status
+from bot.scheduler import DeadlineExceeded, Priority, RequestScheduler
+from bot.singleflight import SingleFlight
+from typing import List, Dict, Optional, Sequence, Tuple, Any, AsyncIterator, Set
 from enum import Enum
-from dataclasses import dataclass, field
-from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
@@ -27,22 +38,15 @@ class ResponseType(Enum):
     STREAMING = "streaming"
 
 
-@dataclass
-class CacheEntry:
-    """Cache entry with TTL support"""
-    content: str
-    timestamp: datetime = field(default_factory=datetime.now)
-    hit_count: int = 0
-    ttl_seconds: int = 3600  # Default 1 hour
-    
-    def is_expired(self) -> bool:
-        """Check if cache entry has expired"""
-        return datetime.now() - self.timestamp > timedelta(seconds=self.ttl_seconds)
-    
-    def touch(self) -> None:
-        """Update hit count and timestamp"""
-        self.hit_count += 1
-        self.timestamp = datetime.now()
+class ServiceNotice(str):
+    """
+    Reply written by the client itself (rate limited, upstream down), not by the model
+
+    Still a str, so callers that only show the reply need no changes. Callers
+    that keep conversation history should send it but not record it.
+    """
+
+    __slots__ = ()
 
 
 class SarvamClient:
@@ -51,72 +55,158 @@ class SarvamClient:
     def __init__(self, config: BotConfig):
         self.config = config
         self.client = SarvamAI(api_subscription_key=config.sarvam_api_key)
+        self.http_transport: Optional[SarvamHTTPTransport] = None
+        if config.sarvam_transport == "http":
+            self.http_transport = SarvamHTTPTransport(config)
         
         # Advanced features
-        self.response_cache: Dict[str, CacheEntry] = {}
+        self.response_cache = ResponseCache(
+            max_bytes=config.cache_max_bytes,
+            policy=config.cache_policy,
+            stale_grace=config.cache_stale_grace,
+        )
+        self.disk_cache: Optional[DiskCache] = (
+            DiskCache(config.disk_cache_path) if config.disk_cache_path else None
+        )
+        self._background_tasks: Set[asyncio.Task] = set()
+        self._compaction_task: Optional[asyncio.Task] = None
+        self._system_digest = message_digest("user", config.system_prompt)
+        self._system_message = FrozenMessage(role="user", content=config.system_prompt)
         self.thinking_mode = ThinkingMode.AUTO
-        self.response_type = ResponseType.QUICK
-        self.max_cache_size = 1000
+        self.response_type = (
+            ResponseType.STREAMING if config.stream_responses else ResponseType.QUICK
+        )
         self.request_timeout = 30
-        self.request_semaphore = asyncio.Semaphore(10)  # Limit concurrent requests
+        # Adaptive limit on concurrent upstream requests
+        self.limiter = AdaptiveLimiter(
+            initial_limit=config.limiter_initial,
+            min_limit=config.limiter_min,
+            max_limit=config.limiter_max,
+            latency_target=config.limiter_latency_target,
+        )
+        self.scheduler = RequestScheduler(self.limiter)
+        self.retry_policy = RetryPolicy(
+            max_attempts=config.max_retries,
+            base_delay=config.retry_delay_base,
+            max_delay=config.retry_max_delay,
+        )
+        self.retry_budget = RetryBudget(ratio=config.retry_budget_ratio)
+        self.circuit = CircuitBreaker(
+            failure_threshold=config.circuit_failure_threshold,
+            reset_timeout=config.circuit_reset_timeout,
+            # one attempt plus its hedge
+            probe_timeout=2 * self.request_timeout,
+        )
+        # Hedged requests: duplicate calls slower than a latency percentile
+        self.latency_tracker = LatencyTracker(min_samples=config.hedge_min_samples)
+        self.hedge_budget = RetryBudget(
+            ratio=config.hedge_budget_ratio, min_per_second=0.0, max_tokens=5.0
+        )
+        self.inflight = SingleFlight()
+        self.rate_limiter = HierarchicalRateLimiter(
+            user_requests=config.rate_limit_requests,
+            guild_requests=config.rate_limit_guild_requests,
+            global_requests=config.rate_limit_global_requests,
+            window_seconds=config.rate_limit_window,
+            max_wait=config.rate_limit_max_wait,
+        )
         
         # Stats tracking
         self.stats = {
             "total_requests": 0,
-            "cache_hits": 0,
-            "cache_misses": 0,
             "errors": 0,
             "retries": 0,
+            "retries_skipped_budget": 0,
+            "non_retryable_errors": 0,
+            "circuit_fast_fails": 0,
+            "auto_classified": 0,
+            "auto_thinking": 0,
+            "hedges_sent": 0,
+            "hedge_wins": 0,
+            "rate_limited": 0,
+            "deadline_dropped": 0,
+            "streamed_responses": 0,
+            "ttft_total_ms": 0.0,
+            "last_ttft_ms": 0.0,
         }
 
-    def _generate_cache_key(self, messages: List[Dict[str, str]], use_thinking: bool = False) -> str:
-        """Generate deterministic cache key from messages"""
-        msg_str = str(sorted([(m.get("role"), m.get("content")) for m in messages]))
-        thinking_str = str(use_thinking)
-        cache_input = f"{msg_str}:{thinking_str}"
-        return hashlib.md5(cache_input.encode()).hexdigest()
+    def _generate_cache_key(
+        self,
+        messages: Sequence[Dict[str, str]],
+        use_thinking: bool = False,
+        context_key: Optional[ContextKey] = None,
+    ) -> str:
+        """Generate deterministic, order-preserving cache key from messages"""
+        if context_key is None:
+            context_key = hash_messages(messages)
+        return f"{context_key}:{int(use_thinking)}"
+
+    def _spawn(self, coro) -> asyncio.Task:
+        """Run a fire-and-forget coroutine, keeping a reference until it finishes"""
+        task = asyncio.ensure_future(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
 
     def _get_cached_response(self, cache_key: str) -> Optional[str]:
-        """Retrieve response from cache if valid"""
-        if cache_key in self.response_cache:
-            entry = self.response_cache[cache_key]
-            if not entry.is_expired():
-                entry.touch()
-                self.stats["cache_hits"] += 1
-                logger.debug(f"Cache HIT (count: {entry.hit_count}): {cache_key}")
-                return entry.content
-            else:
-                # Remove expired entry
-                del self.response_cache[cache_key]
+        """Retrieve response from the in-memory cache if valid"""
+        return self.response_cache.get(cache_key)
+
+    async def _lookup_cache(self, cache_key: str) -> Optional[str]:
+        """Retrieve response from memory, falling back to the disk tier"""
+        cached = self._get_cached_response(cache_key)
+        if cached or self.disk_cache is None:
+            return cached
         
-        self.stats["cache_misses"] += 1
-        return None
+        try:
+            row = await self.disk_cache.get(cache_key)
+        except Exception as e:
+            logger.warning(f"Disk cache lookup failed: {e}")
+            return None
+        if row is None:
+            return None
+        
+        content, remaining_ttl = row
+        self.response_cache.put(cache_key, content, ttl_seconds=remaining_ttl)
+        return content
 
     def _cache_response(self, cache_key: str, content: str, ttl_seconds: int = 3600) -> None:
-        """Store response in cache with TTL"""
-        # Implement simple LRU eviction
-        if len(self.response_cache) >= self.max_cache_size:
-            # Remove least used entry
-            least_used = min(
-                self.response_cache.items(),
-                key=lambda x: (x[1].hit_count, x[1].timestamp)
-            )
-            del self.response_cache[least_used[0]]
-            logger.debug(f"Evicted cache entry: {least_used[0]}")
-        
-        self.response_cache[cache_key] = CacheEntry(content, ttl_seconds=ttl_seconds)
-        logger.debug(f"Cached response: {cache_key}")
+        """Store response in cache with TTL (written through to disk in the background)"""
+        self.response_cache.put(cache_key, content, ttl_seconds=ttl_seconds)
+        if self.disk_cache is not None:
+            self._spawn(self._write_disk_cache(cache_key, content, ttl_seconds))
+
+    async def _write_disk_cache(self, cache_key: str, content: str, ttl_seconds: int) -> None:
+        try:
+            await self.disk_cache.put(cache_key, content, ttl_seconds)
+        except Exception as e:
+            logger.warning(f"Disk cache write failed: {e}")
+
+    async def _compaction_loop(self) -> None:
+        """Periodically purge expired rows from the disk cache"""
+        while True:
+            await asyncio.sleep(self.config.disk_cache_compact_interval)
+            try:
+                await self.disk_cache.compact()
+            except Exception as e:
+                logger.warning(f"Disk cache compaction failed: {e}")
 
-    def _is_complex_query(self, messages: List[Dict[str, str]]) -> bool:
+    def _is_complex_query(
+        self,
+        messages: Sequence[Dict[str, str]],
+        complexity: Optional[float] = None,
+    ) -> bool:
         """Detect query complexity for AUTO thinking mode"""
-        complexity_indicators = [
-            "explain", "analyze", "compare", "contrast", "research",
-            "solve", "calculate", "debug", "design", "architecture",
-            "why", "how", "complex", "complicated"
-        ]
+        if complexity is None:
+            # Don't let the prepended system prompt count as a user turn
+            if messages and messages[0].get("content") == self.config.system_prompt:
+                messages = messages[1:]
+            complexity = score_messages(messages)
         
-        full_text = " ".join([m.get("content", "").lower() for m in messages])
-        return any(indicator in full_text for indicator in complexity_indicators)
+        result = is_complex(complexity, self.config.complexity_threshold)
+        self.stats["auto_classified"] += 1
+        self.stats["auto_thinking"] += result
+        return result
 
     def _get_thinking_config(self, use_thinking: Optional[bool] = None) -> Dict[str, Any]:
         """Get thinking configuration based on mode"""
@@ -146,7 +236,7 @@ class SarvamClient:
 
     def _build_request_params(
         self,
-        messages: List[Dict[str, str]],
+        messages: Sequence[Dict[str, str]],
         temperature: float = 0.7,
         max_tokens: Optional[int] = None,
         use_thinking: Optional[bool] = None,
@@ -158,7 +248,8 @@ class SarvamClient:
         
         params = {
             "model": self.config.sarvam_model_name,
-            "messages": messages,
+            # JSON encoders only accept real lists
+            "messages": list(messages),
             "temperature": temperature,
             "max_tokens": max_tokens,
             "top_p": top_p,
@@ -215,10 +306,16 @@ class SarvamClient:
 
     async def _call_api(self, request_params: Dict[str, Any]) -> Any:
         """Call Sarvam API with error handling"""
+        started = time.monotonic()
         try:
             import asyncio as aio
             
-            if aio.iscoroutinefunction(self.client.chat.completions):
+            if self.http_transport is not None:
+                response = await asyncio.wait_for(
+                    self.http_transport.chat_completions(**request_params),
+                    timeout=self.request_timeout
+                )
+            elif aio.iscoroutinefunction(self.client.chat.completions):
                 response = await asyncio.wait_for(
                     self.client.chat.completions(**request_params),
                     timeout=self.request_timeout
@@ -233,6 +330,7 @@ class SarvamClient:
                     timeout=self.request_timeout
                 )
             
+            self.latency_tracker.record(time.monotonic() - started)
             return response
             
         except asyncio.TimeoutError:
@@ -242,40 +340,267 @@ class SarvamClient:
             logger.error(f"Sarvam API call failed: {e}")
             raise
 
+    async def _call_api_hedged(self, request_params: Dict[str, Any]) -> Any:
+        """
+        Call Sarvam API, sending a duplicate request if the first has not
+        answered by the configured percentile of recent latencies.
+        
+        The first successful response wins and the other call is cancelled.
+        Hedges only go out when the hedge budget allows, nobody is queued
+        for an upstream slot and the concurrency limiter has a spare slot.
+        """
+        if not self.config.hedge_enabled:
+            return await self._call_api(request_params)
+        
+        self.hedge_budget.record_request()
+        hedge_delay = self.latency_tracker.percentile(self.config.hedge_percentile)
+        primary = asyncio.ensure_future(self._call_api(request_params))
+        hedge: Optional[asyncio.Future] = None
+        try:
+            if hedge_delay is None:
+                return await primary
+            
+            done, _ = await asyncio.wait({primary}, timeout=hedge_delay)
+            if done:
+                return primary.result()
+            
+            if self.scheduler.queue_depth or not self.limiter.try_acquire():
+                return await primary
+            # Spend hedge budget only once a slot is actually available
+            if not self.hedge_budget.try_spend():
+                self.limiter.release()
+                return await primary
+            
+            try:
+                self.stats["hedges_sent"] += 1
+                logger.debug(f"Hedging request after {hedge_delay * 1000:.0f} ms")
+                hedge = asyncio.ensure_future(self._call_api(request_params))
+                pending = {primary, hedge}
+                error: Optional[BaseException] = None
+                while pending:
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in done:
+                        if task.exception() is None:
+                            if task is hedge:
+                                self.stats["hedge_wins"] += 1
+                            return task.result()
+                        if error is None or task is primary:
+                            error = task.exception()
+                raise error
+            finally:
+                self.limiter.release()
+        finally:
+            for task in (primary, hedge):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    @staticmethod
+    def _is_overload_error(error: BaseException) -> bool:
+        """Whether an error signals upstream overload (timeout, 429 or 5xx)"""
+        if isinstance(error, asyncio.TimeoutError):
+            return True
+        status = error_status(error)
+        return status is not None and (status == 429 or status >= 500)
+
     async def _retry_with_backoff(
         self,
         request_params: Dict[str, Any],
-        max_retries: int = 3,
-        base_delay: float = 1.0
+        priority: Priority = Priority.COMMAND,
+        flow: Any = None,
+        deadline: Optional[float] = None,
     ) -> Optional[Any]:
-        """Retry API call with exponential backoff"""
-        for attempt in range(max_retries):
-            try:
-                response = await self._call_api(request_params)
-                return response
+        """
+        Call the API, retrying transient failures with jittered backoff.
+        
+        Each attempt takes its own scheduler slot, so no slot is held while
+        sleeping between attempts. Retries stop early when the retry budget
+        is spent, the error is not retryable or the circuit opens.
+        """
+        budget = self.scheduler.deadlines[priority] if deadline is None else deadline
+        expires_at = time.monotonic() + budget
+        delay = self.retry_policy.base_delay
+        self.retry_budget.record_request()
+        
+        for attempt in range(self.retry_policy.max_attempts):
+            probing = self.circuit.state is CircuitState.HALF_OPEN
+            if not self.circuit.allow_request():
+                self.stats["circuit_fast_fails"] += 1
+                raise CircuitOpenError()
             
-            except Exception as e:
-                self.stats["retries"] += 1
+            recorded = False
+            try:
+                remaining = expires_at - time.monotonic()
+                if remaining <= 0:
+                    raise DeadlineExceeded()
                 
-                if attempt == max_retries - 1:
-                    logger.error(f"Max retries reached. Last error: {e}")
+                queued = time.monotonic()
+                async with self.scheduler.slot(priority, flow, remaining):
+                    started = time.monotonic()
+                    metrics.observe("queue_wait", started - queued)
+                    try:
+                        response = await self._call_api_hedged(request_params)
+                    except Exception as e:
+                        metrics.observe("upstream_attempt", time.monotonic() - started)
+                        error = e
+                    else:
+                        metrics.observe("upstream_attempt", time.monotonic() - started)
+                        self.limiter.on_success(time.monotonic() - started)
+                        self.circuit.record_success()
+                        recorded = True
+                        return response
+                
+                if not self.retry_policy.is_retryable(error):
+                    # Upstream answered, it just rejected this request
+                    self.circuit.record_success()
+                    recorded = True
+                    self.stats["non_retryable_errors"] += 1
+                    logger.error(f"Non-retryable Sarvam error: {error}")
                     return None
                 
-                delay = base_delay * (2 ** attempt)  # Exponential backoff
-                logger.warning(f"Attempt {attempt + 1} failed. Retrying in {delay}s...")
-                await asyncio.sleep(delay)
+                self.circuit.record_failure()
+                recorded = True
+            finally:
+                # Cancelled or dropped past the deadline before upstream answered
+                if probing and not recorded:
+                    self.circuit.release_probe()
+            
+            if self._is_overload_error(error):
+                self.limiter.on_overload()
+            
+            if attempt == self.retry_policy.max_attempts - 1:
+                logger.error(f"Max retries reached. Last error: {error}")
+                return None
+            if not self.retry_budget.try_spend():
+                self.stats["retries_skipped_budget"] += 1
+                logger.error(f"Retry budget exhausted. Last error: {error}")
+                return None
+            
+            delay = self.retry_policy.next_delay(delay, error)
+            if time.monotonic() + delay >= expires_at:
+                logger.error(f"No time left to retry before the deadline. Last error: {error}")
+                return None
+            
+            self.stats["retries"] += 1
+            logger.warning(f"Attempt {attempt + 1} failed. Retrying in {delay:.2f}s...")
+            await asyncio.sleep(delay)
         
         return None
 
+    async def _check_rate_limit(
+        self,
+        guild_id: Optional[int],
+        user_id: Optional[int],
+    ) -> Optional[ServiceNotice]:
+        """Wait for rate limit tokens; returns a user-facing notice if over the limit"""
+        try:
+            await self.rate_limiter.acquire(guild_id, user_id)
+            return None
+        except RateLimitExceeded as e:
+            self.stats["rate_limited"] += 1
+            return ServiceNotice(
+                "⏳ Too many requests right now. "
+                f"Please try again in {math.ceil(e.retry_after)}s."
+            )
+
+    def _unavailable_reply(self, cache_key: str) -> str:
+        """Best answer while the circuit is open: a stale cached reply if there is one"""
+        stale = self.response_cache.get_stale(cache_key)
+        if stale:
+            return stale
+        return ServiceNotice(
+            "⚠️ The AI service is temporarily unavailable. Please try again in a little while."
+        )
+
+    @staticmethod
+    def _flow_key(guild_id: Optional[int], user_id: Optional[int]) -> Any:
+        """Fair-queuing flow: the guild, or the user for DMs and unattributed calls"""
+        if guild_id is not None:
+            return ("guild", guild_id)
+        return ("user", user_id)
+
+    def _prepare_messages(
+        self,
+        messages: Sequence[Dict[str, str]],
+        use_thinking: Optional[bool],
+        context_key: Optional[ContextKey],
+    ) -> Tuple[Sequence[Dict[str, str]], str]:
+        """Put the system prompt in front when needed and return (messages, cache key)"""
+        # Validate and normalize messages without touching the caller's sequence
+        if not messages or messages[0].get("role") != "user":
+            if not isinstance(messages, ContextView):
+                messages = ContextView(messages)
+            messages = messages.with_prefix(self._system_message)
+            if context_key is not None:
+                context_key = context_key.prepend(self._system_digest)
+        
+        return messages, self._generate_cache_key(messages, use_thinking or False, context_key)
+
+    async def _fetch_response(
+        self,
+        messages: Sequence[Dict[str, str]],
+        cache_key: str,
+        use_thinking: Optional[bool],
+        use_cache: bool,
+        cache_ttl: int,
+        temperature: float,
+        max_tokens: Optional[int],
+        priority: Priority = Priority.COMMAND,
+        flow: Any = None,
+        deadline: Optional[float] = None,
+    ) -> str:
+        """Call the API for a cache miss and cache the extracted content"""
+        logger.info(f"Sending request to Sarvam API (thinking={use_thinking})")
+        
+        # Build request parameters
+        request_params = self._build_request_params(
+            messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            use_thinking=use_thinking,
+        )
+        
+        # Call API with retries (each attempt waits for its own upstream slot)
+        response = await self._retry_with_backoff(
+            request_params, priority, flow, deadline
+        )
+        
+        if response is None:
+            self.stats["errors"] += 1
+            return "Sorry, I encountered an error while generating a response."
+        
+        logger.debug(f"Sarvam raw response: {response}")
+        
+        # Extract content
+        with metrics.timer("extract"):
+            content = self._extract_content_from_response(response)
+        
+        if not content:
+            self.stats["errors"] += 1
+            return "Sorry, I couldn't generate a response."
+        
+        # Cache the response
+        if use_cache:
+            self._cache_response(cache_key, content, cache_ttl)
+        
+        return content
+
     async def generate_response(
         self,
-        messages: List[Dict[str, str]],
+        messages: Sequence[Dict[str, str]],
         use_thinking: Optional[bool] = None,
         response_type: ResponseType = ResponseType.QUICK,
         cache_ttl: int = 3600,
         use_cache: bool = True,
         temperature: float = 0.7,
         max_tokens: Optional[int] = None,
+        context_key: Optional[ContextKey] = None,
+        guild_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+        priority: Priority = Priority.COMMAND,
+        deadline: Optional[float] = None,
+        complexity: Optional[float] = None,
     ) -> Optional[str]:
         """
         Generate response from Sarvam API with advanced features.
@@ -288,91 +613,346 @@ class SarvamClient:
             use_cache: Whether to use caching
             temperature: Model temperature (0.0-1.0)
             max_tokens: Maximum response tokens
+            context_key: Precomputed hash of messages (see ChatManager.get_context_key)
+            guild_id: Requesting guild, for rate limiting
+            user_id: Requesting user, for rate limiting
+            priority: Scheduling class for the upstream call
+            deadline: Seconds the reply stays useful; stale requests are dropped
+            complexity: Cached complexity score (see ChatManager.get_complexity)
         
         Returns:
-            Generated response string or None on error
+            Generated response string (a ServiceNotice when rejected before
+            reaching the model), or None if dropped past its deadline
         """
         try:
             self.stats["total_requests"] += 1
             
-            # Validate and normalize messages
-            if not messages or messages[0].get("role") != "user":
-                messages.insert(0, {
-                    "role": "user",
-                    "content": self.config.system_prompt
-                })
-            
-            # Generate cache key
-            cache_key = self._generate_cache_key(messages, use_thinking or False)
+            messages, cache_key = self._prepare_messages(messages, use_thinking, context_key)
             
             # Check cache
             if use_cache:
-                cached = self._get_cached_response(cache_key)
+                with metrics.timer("cache_lookup"):
+                    cached = await self._lookup_cache(cache_key)
                 if cached:
                     return cached
             
+            # Fail fast while upstream is down
+            if self.circuit.is_open:
+                self.stats["circuit_fast_fails"] += 1
+                return self._unavailable_reply(cache_key)
+            
+            limited = await self._check_rate_limit(guild_id, user_id)
+            if limited:
+                return limited
+            
             # Determine thinking mode for AUTO
             if use_thinking is None and self.thinking_mode == ThinkingMode.AUTO:
-                use_thinking = self._is_complex_query(messages)
+                use_thinking = self._is_complex_query(messages, complexity)
                 logger.info(f"AUTO mode: Complex query detected = {use_thinking}")
             
-            logger.info(f"Sending request to Sarvam API (thinking={use_thinking})")
-            
-            # Acquire semaphore to limit concurrent requests
-            async with self.request_semaphore:
-                # Build request parameters
-                request_params = self._build_request_params(
-                    messages,
-                    temperature=temperature,
-                    max_tokens=max_tokens,
-                    use_thinking=use_thinking,
+            def fetch():
+                return self._fetch_response(
+                    messages, cache_key, use_thinking, use_cache,
+                    cache_ttl, temperature, max_tokens,
+                    priority, self._flow_key(guild_id, user_id), deadline,
                 )
-                
-                # Call API with retries
-                response = await self._retry_with_backoff(
-                    request_params,
-                    max_retries=self.config.max_retries,
-                    base_delay=self.config.retry_delay_base
-                )
-                
-                if response is None:
-                    self.stats["errors"] += 1
-                    return "Sorry, I encountered an error while generating a response."
-                
-                logger.debug(f"Sarvam raw response: {response}")
-                
-                # Extract content
-                content = self._extract_content_from_response(response)
-                
-                if not content:
-                    self.stats["errors"] += 1
-                    return "Sorry, I couldn't generate a response."
-                
-                # Cache the response
-                if use_cache:
-                    self._cache_response(cache_key, content, cache_ttl)
-                
-                return content
+            
+            # Identical requests already in flight share a single upstream call
+            if use_cache:
+                flight_key = f"{cache_key}:{temperature}:{max_tokens}"
+                return await self.inflight.do(flight_key, fetch)
+            return await fetch()
+        
+        except DeadlineExceeded:
+            self.stats["deadline_dropped"] += 1
+            logger.warning(f"Dropped stale {priority.name.lower()} request before upstream call")
+            return None
+        
+        except CircuitOpenError:
+            return self._unavailable_reply(cache_key)
         
         except Exception as e:
             self.stats["errors"] += 1
             logger.error(f"Sarvam API Error: {e}", exc_info=True)
             return "Sorry, I encountered an error while generating a response."
 
+    async def summarize_conversation(
+        self,
+        previous_summary: Optional[str],
+        turns: List[Dict[str, str]],
+        max_tokens: int = 300,
+    ) -> Optional[str]:
+        """
+        Fold conversation turns into a running summary (background priority).
+        
+        Args:
+            previous_summary: Summary so far, if any
+            turns: Turns to add, oldest first
+            max_tokens: Maximum summary tokens
+        
+        Returns:
+            Updated summary text, or None if it could not be generated
+        """
+        if self.circuit.is_open:
+            return None
+        
+        transcript = "\n".join(f"{turn['role']}: {turn['content']}" for turn in turns)
+        prompt = (
+            "Update the running summary of a Discord conversation. Keep names, facts, "
+            "decisions and open questions; drop small talk. Reply with the summary only, "
+            "in at most a few sentences.\n\n"
+            f"Current summary:\n{previous_summary or '(none)'}\n\n"
+            f"New turns:\n{transcript}"
+        )
+        request_params = self._build_request_params(
+            [{"role": "user", "content": prompt}],
+            temperature=0.3,
+            max_tokens=max_tokens,
+            use_thinking=False,
+        )
+        try:
+            response = await self._retry_with_backoff(
+                request_params, Priority.BACKGROUND, ("background", None)
+            )
+        except (DeadlineExceeded, CircuitOpenError):
+            return None
+        if response is None:
+            return None
+        return self._extract_content_from_response(response)
+
+    async def stream_response(
+        self,
+        messages: Sequence[Dict[str, str]],
+        use_thinking: Optional[bool] = None,
+        cache_ttl: int = 3600,
+        use_cache: bool = True,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        context_key: Optional[ContextKey] = None,
+        guild_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+        priority: Priority = Priority.INTERACTIVE,
+        deadline: Optional[float] = None,
+        complexity: Optional[float] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream a response from Sarvam API as it is generated.
+        
+        Cache hits and the SDK transport (which cannot stream) yield the
+        whole response as a single fragment. Transient failures are retried
+        like in generate_response until the first fragment is yielded.
+        Identical concurrent streams are not coalesced.
+        
+        Args:
+            messages: List of message dictionaries
+            use_thinking: Enable/disable thinking. None = AUTO mode
+            cache_ttl: Cache TTL in seconds
+            use_cache: Whether to use caching
+            temperature: Model temperature (0.0-1.0)
+            max_tokens: Maximum response tokens
+            context_key: Precomputed hash of messages (see ChatManager.get_context_key)
+            guild_id: Requesting guild, for rate limiting
+            user_id: Requesting user, for rate limiting
+            priority: Scheduling class for the upstream call
+            deadline: Seconds the reply stays useful; stale requests yield nothing
+            complexity: Cached complexity score (see ChatManager.get_complexity)
+        
+        Yields:
+            Response text fragments (a single ServiceNotice when rejected
+            before reaching the model)
+        """
+        self.stats["total_requests"] += 1
+        messages, cache_key = self._prepare_messages(messages, use_thinking, context_key)
+        
+        if use_cache:
+            with metrics.timer("cache_lookup"):
+                cached = await self._lookup_cache(cache_key)
+            if cached:
+                yield cached
+                return
+        
+        if self.circuit.is_open:
+            self.stats["circuit_fast_fails"] += 1
+            yield self._unavailable_reply(cache_key)
+            return
+        
+        limited = await self._check_rate_limit(guild_id, user_id)
+        if limited:
+            yield limited
+            return
+        
+        if use_thinking is None and self.thinking_mode == ThinkingMode.AUTO:
+            use_thinking = self._is_complex_query(messages, complexity)
+            logger.info(f"AUTO mode: Complex query detected = {use_thinking}")
+        
+        flow = self._flow_key(guild_id, user_id)
+        if self.http_transport is None:
+            try:
+                yield await self._fetch_response(
+                    messages, cache_key, use_thinking, use_cache,
+                    cache_ttl, temperature, max_tokens,
+                    priority, flow, deadline,
+                )
+            except DeadlineExceeded:
+                self.stats["deadline_dropped"] += 1
+            except CircuitOpenError:
+                yield self._unavailable_reply(cache_key)
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"Sarvam API Error: {e}", exc_info=True)
+                yield "Sorry, I encountered an error while generating a response."
+            return
+        
+        logger.info(f"Streaming request to Sarvam API (thinking={use_thinking})")
+        request_params = self._build_request_params(
+            messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            use_thinking=use_thinking,
+        )
+        parts: List[str] = []
+        # Same retry policy and budget as _retry_with_backoff, but only until
+        # the first fragment has been yielded: after that a retry would repeat text
+        budget = self.scheduler.deadlines[priority] if deadline is None else deadline
+        expires_at = time.monotonic() + budget
+        delay = self.retry_policy.base_delay
+        self.retry_budget.record_request()
+        
+        for attempt in range(self.retry_policy.max_attempts):
+            queued = time.monotonic()
+            try:
+                remaining = expires_at - queued
+                if remaining <= 0:
+                    raise DeadlineExceeded()
+                await self.scheduler.acquire(priority, flow, remaining)
+            except DeadlineExceeded:
+                self.stats["deadline_dropped"] += 1
+                return
+            metrics.observe("queue_wait", time.monotonic() - queued)
+            # Same single half-open probe as _retry_with_backoff
+            probing = self.circuit.state is CircuitState.HALF_OPEN
+            if not self.circuit.allow_request():
+                self.limiter.release()
+                self.stats["circuit_fast_fails"] += 1
+                yield self._unavailable_reply(cache_key)
+                return
+            recorded = False
+            error: Optional[BaseException] = None
+            try:
+                started = time.monotonic()
+                stream = self.http_transport.stream_chat_completions(**request_params)
+                try:
+                    while True:
+                        try:
+                            # request_timeout bounds the gap between fragments
+                            delta = await asyncio.wait_for(
+                                stream.__anext__(), timeout=self.request_timeout
+                            )
+                        except StopAsyncIteration:
+                            break
+                        if not parts:
+                            self.limiter.on_success(time.monotonic() - started)
+                            self.circuit.record_success()
+                            recorded = True
+                            ttft_ms = (time.monotonic() - started) * 1000
+                            metrics.observe("first_token", ttft_ms / 1000)
+                            self.stats["streamed_responses"] += 1
+                            self.stats["ttft_total_ms"] += ttft_ms
+                            self.stats["last_ttft_ms"] = ttft_ms
+                            logger.debug(f"Time to first token: {ttft_ms:.0f} ms")
+                        parts.append(delta)
+                        yield delta
+                except Exception as e:
+                    error = e
+                    if not self.retry_policy.is_retryable(e):
+                        if not recorded:
+                            # Upstream answered, it just rejected this request
+                            self.circuit.record_success()
+                            recorded = True
+                    elif not parts:
+                        self.circuit.record_failure()
+                        recorded = True
+                    if self._is_overload_error(e):
+                        self.limiter.on_overload()
+                finally:
+                    await stream.aclose()
+            finally:
+                self.limiter.release()
+                if probing and not recorded:
+                    self.circuit.release_probe()
+            
+            if error is None:
+                break
+            
+            if parts:
+                self.stats["errors"] += 1
+                logger.error(f"Sarvam streaming error after partial reply: {error}")
+                return
+            if not self.retry_policy.is_retryable(error):
+                self.stats["non_retryable_errors"] += 1
+                reason = "Non-retryable Sarvam streaming error"
+            elif attempt == self.retry_policy.max_attempts - 1:
+                reason = "Max retries reached"
+            elif not self.retry_budget.try_spend():
+                self.stats["retries_skipped_budget"] += 1
+                reason = "Retry budget exhausted"
+            else:
+                delay = self.retry_policy.next_delay(delay, error)
+                if time.monotonic() + delay < expires_at:
+                    self.stats["retries"] += 1
+                    logger.warning(f"Streaming attempt {attempt + 1} failed. Retrying in {delay:.2f}s...")
+                    await asyncio.sleep(delay)
+                    continue
+                reason = "No time left to retry before the deadline"
+            self.stats["errors"] += 1
+            logger.error(f"{reason}. Last error: {error}")
+            yield "Sorry, I encountered an error while generating a response."
+            return
+        
+        content = "".join(parts).strip()
+        if content and use_cache:
+            self._cache_response(cache_key, content, cache_ttl)
+
     def get_stats(self) -> Dict[str, Any]:
         """Get client statistics"""
-        cache_hit_rate = (
-            self.stats["cache_hits"] / 
-            (self.stats["cache_hits"] + self.stats["cache_misses"])
-            if (self.stats["cache_hits"] + self.stats["cache_misses"]) > 0
-            else 0
-        )
+        cache_stats = self.response_cache.get_stats()
+        lookups = cache_stats["hits"] + cache_stats["misses"]
+        cache_hit_rate = cache_stats["hits"] / lookups if lookups > 0 else 0
         
         return {
             **self.stats,
-            "cache_size": len(self.response_cache),
+            "cache_hits": cache_stats["hits"],
+            "cache_misses": cache_stats["misses"],
+            "cache_evictions": cache_stats["evictions"],
+            "cache_expirations": cache_stats["expirations"],
+            "cache_size": cache_stats["entries"],
+            "cache_bytes": cache_stats["bytes"],
             "cache_hit_rate": f"{cache_hit_rate * 100:.2f}%",
+            "avg_ttft_ms": round(
+                self.stats["ttft_total_ms"] / self.stats["streamed_responses"], 1
+            ) if self.stats["streamed_responses"] else 0.0,
+            **{f"limiter_{k}": v for k, v in self.limiter.get_stats().items()},
+            **{f"rate_limit_{k}": v for k, v in self.rate_limiter.get_stats().items()},
+            **{f"scheduler_{k}": v for k, v in self.scheduler.get_stats().items()},
+            **{f"circuit_{k}": v for k, v in self.circuit.get_stats().items()},
+            "retry_budget_tokens": round(self.retry_budget.tokens, 2),
+            "auto_thinking_rate": (
+                f"{self.stats['auto_thinking'] / self.stats['auto_classified'] * 100:.2f}%"
+                if self.stats["auto_classified"] else "0.00%"
+            ),
+            "hedge_win_rate": (
+                f"{self.stats['hedge_wins'] / self.stats['hedges_sent'] * 100:.2f}%"
+                if self.stats["hedges_sent"] else "0.00%"
+            ),
+            "cache_stale_hits": cache_stats["stale_hits"],
+            "coalesced_requests": self.inflight.stats["coalesced"],
+            "in_flight_requests": len(self.inflight),
             "thinking_mode": self.thinking_mode.value,
+            "transport": "http" if self.http_transport is not None else "sdk",
+            **(
+                {f"disk_cache_{k}": v for k, v in self.disk_cache.get_stats().items()}
+                if self.disk_cache is not None else {}
+            ),
         }
 
     def set_thinking_mode(self, mode: ThinkingMode) -> None:
@@ -383,4 +963,38 @@ class SarvamClient:
     def clear_cache(self) -> None:
         """Clear response cache"""
         self.response_cache.clear()
+        if self.disk_cache is not None:
+            self._spawn(self.disk_cache.clear())
         logger.info("Response cache cleared")
+
+    async def start(self) -> None:
+        """Open the disk cache tier, warm the hot set and start background work"""
+        if self.disk_cache is None:
+            return
+        
+        try:
+            await self.disk_cache.open()
+            await self.disk_cache.compact()
+            rows = await self.disk_cache.warm(self.config.disk_cache_warm_entries)
+        except Exception as e:
+            logger.error(f"Disk cache unavailable, continuing without it: {e}")
+            self.disk_cache = None
+            return
+        
+        for cache_key, content, remaining_ttl in rows:
+            self.response_cache.put(cache_key, content, ttl_seconds=remaining_ttl)
+        logger.info(f"Warmed response cache with {len(rows)} entries from disk")
+        
+        self._compaction_task = asyncio.create_task(self._compaction_loop())
+
+    async def close(self) -> None:
+        """Release network resources and flush pending background work"""
+        if self._compaction_task is not None:
+            self._compaction_task.cancel()
+            self._compaction_task = None
+        if self._background_tasks:
+            await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        if self.disk_cache is not None:
+            await self.disk_cache.close()
+        if self.http_transport is not None:
+            await self.http_transport.close()
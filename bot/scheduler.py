@@ -0,0 +1,191 @@
+"""
+Priority-aware scheduling of upstream request slots
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Any, AsyncIterator, Dict, Hashable, List, Optional
+
+from bot.limiter import AdaptiveLimiter
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Request priority classes (lower value is served first)"""
+    INTERACTIVE = 0   # live chat replies
+    COMMAND = 1       # quick one-shot commands (!ask, !define, !quote)
+    BULK = 2          # long generations (!notes, !explain, ...)
+    BACKGROUND = 3    # housekeeping work nobody is waiting on
+
+
+class DeadlineExceeded(Exception):
+    """Request went stale while queued and was dropped before reaching upstream"""
+
+
+class RequestScheduler:
+    """
+    Front door for AdaptiveLimiter slots.
+
+    Waiting requests are served strictly by priority class; within a class,
+    flows (guilds, or users in DMs) share slots by weighted fair queuing so
+    one busy guild cannot starve the others. Requests whose deadline passes
+    while queued are dropped without taking a slot.
+    """
+
+    DEFAULT_DEADLINES = {
+        Priority.INTERACTIVE: 30.0,
+        Priority.COMMAND: 60.0,
+        Priority.BULK: 120.0,
+        Priority.BACKGROUND: 600.0,
+    }
+
+    def __init__(
+        self,
+        limiter: AdaptiveLimiter,
+        flow_weights: Optional[Dict[Hashable, float]] = None,
+        deadlines: Optional[Dict[Priority, float]] = None,
+    ):
+        self.limiter = limiter
+        self.flow_weights = flow_weights or {}
+        self.deadlines = {**self.DEFAULT_DEADLINES, **(deadlines or {})}
+
+        # Per class: heap of [virtual_finish, seq, future, deadline]
+        self._queues: Dict[Priority, List[list]] = {p: [] for p in Priority}
+        self._virtual_time: Dict[Priority, float] = {p: 0.0 for p in Priority}
+        self._flow_finish: Dict[Priority, Dict[Hashable, float]] = {p: {} for p in Priority}
+        self._seq = itertools.count()
+        self._queued = 0
+
+        self.stats = {
+            "dispatched": {p.name.lower(): 0 for p in Priority},
+            "deadline_dropped": 0,
+            "total_wait_ms": 0.0,
+            "max_wait_ms": 0.0,
+            "waits": 0,
+        }
+        limiter.add_listener(self._dispatch)
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queued
+
+    def _enqueue(self, priority: Priority, flow: Hashable, deadline: float) -> asyncio.Future:
+        vtime = self._virtual_time[priority]
+        finishes = self._flow_finish[priority]
+        weight = self.flow_weights.get(flow, 1.0)
+        finish = max(vtime, finishes.get(flow, 0.0)) + 1.0 / weight
+        finishes[flow] = finish
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queues[priority], [finish, next(self._seq), future, deadline])
+        self._queued += 1
+        return future
+
+    def _prune_flows(self, priority: Priority) -> None:
+        """Forget flows whose last finish tag is already behind virtual time"""
+        finishes = self._flow_finish[priority]
+        if len(finishes) > 1024:
+            vtime = self._virtual_time[priority]
+            for flow in [f for f, finish in finishes.items() if finish <= vtime]:
+                del finishes[flow]
+
+    def _dispatch(self) -> None:
+        """Hand free limiter slots to the best waiting requests"""
+        now = time.monotonic()
+        for priority in Priority:
+            queue = self._queues[priority]
+            while queue:
+                finish, _, future, deadline = queue[0]
+                if future.done():
+                    heapq.heappop(queue)
+                    self._queued -= 1
+                    continue
+                if deadline <= now:
+                    heapq.heappop(queue)
+                    self._queued -= 1
+                    self.stats["deadline_dropped"] += 1
+                    future.set_exception(DeadlineExceeded())
+                    continue
+                if not self.limiter.try_acquire():
+                    return
+                heapq.heappop(queue)
+                self._queued -= 1
+                self._virtual_time[priority] = finish
+                self.stats["dispatched"][priority.name.lower()] += 1
+                future.set_result(None)
+            self._prune_flows(priority)
+
+    async def acquire(
+        self,
+        priority: Priority = Priority.COMMAND,
+        flow: Hashable = None,
+        deadline: Optional[float] = None,
+    ) -> None:
+        """
+        Wait for an upstream slot
+
+        Args:
+            priority: Request class
+            flow: Fairness key (guild ID, or user ID for DMs)
+            deadline: Seconds the result stays useful; defaults per class
+
+        Raises:
+            DeadlineExceeded: if no slot was granted before the deadline
+        """
+        # Fast path: nothing queued ahead of us
+        if not self._queued and self.limiter.try_acquire():
+            self.stats["dispatched"][priority.name.lower()] += 1
+            return
+
+        started = time.monotonic()
+        budget = self.deadlines[priority] if deadline is None else deadline
+        future = self._enqueue(priority, flow, started + budget)
+        self._dispatch()
+        try:
+            await asyncio.wait_for(future, timeout=max(0.0, budget))
+        except asyncio.TimeoutError:
+            self.stats["deadline_dropped"] += 1
+            raise DeadlineExceeded() from None
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                # Slot was granted just as we were cancelled: hand it on
+                self.limiter.release()
+            raise
+        finally:
+            waited_ms = (time.monotonic() - started) * 1000
+            self.stats["total_wait_ms"] += waited_ms
+            self.stats["max_wait_ms"] = max(self.stats["max_wait_ms"], waited_ms)
+            self.stats["waits"] += 1
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        priority: Priority = Priority.COMMAND,
+        flow: Hashable = None,
+        deadline: Optional[float] = None,
+    ) -> AsyncIterator[None]:
+        """Hold an upstream slot for the duration of the block"""
+        await self.acquire(priority, flow, deadline)
+        try:
+            yield
+        finally:
+            self.limiter.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        waits = self.stats["waits"]
+        return {
+            "queue_depth": self._queued,
+            "queued_by_priority": {
+                p.name.lower(): len(self._queues[p]) for p in Priority
+            },
+            "dispatched": dict(self.stats["dispatched"]),
+            "deadline_dropped": self.stats["deadline_dropped"],
+            "avg_wait_ms": round(self.stats["total_wait_ms"] / waits, 1) if waits else 0.0,
+            "max_wait_ms": round(self.stats["max_wait_ms"], 1),
+        }
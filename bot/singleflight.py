@@ -0,0 +1,64 @@
+"""
+Coalescing of identical concurrent requests
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time; concurrent callers with the
+    same key await the result of the call already in flight.
+
+    The shared call runs as its own task, so a waiter being cancelled
+    (e.g. the command that started it timing out) neither cancels the
+    call nor the other waiters. Exceptions propagate to every waiter.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+        self.stats = {
+            "leaders": 0,
+            "coalesced": 0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the exception as retrieved even if every waiter went away
+        if not task.cancelled():
+            task.exception()
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run factory() unless a call for key is already in flight
+
+        Args:
+            key: Identity of the request
+            factory: Zero-argument callable returning the awaitable to run
+
+        Returns:
+            The (shared) result of the call
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._calls[key] = task
+            task.add_done_callback(lambda t, k=key: self._forget(k, t))
+            self.stats["leaders"] += 1
+        else:
+            self.stats["coalesced"] += 1
+            logger.debug(f"Coalesced in-flight request: {key}")
+        return await asyncio.shield(task)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "in_flight": len(self._calls)}
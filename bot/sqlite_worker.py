@@ -0,0 +1,59 @@
+"""
+Shared base for SQLite-backed stores that run on one worker thread
+"""
+
+import asyncio
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+
+class SQLiteWorker:
+    """
+    One SQLite database in WAL mode, used only from a dedicated worker thread.
+
+    Keeping all database work on a single thread keeps blocking I/O off the
+    event loop and the connection on one thread, and runs jobs strictly in
+    submission order. Subclasses set SCHEMA and pass blocking helpers that
+    use self._conn to _run().
+    """
+
+    SCHEMA = ""
+
+    def __init__(self, path: str, thread_name_prefix: str):
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=thread_name_prefix)
+        self._conn: Optional[sqlite3.Connection] = None
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    # ------------------------------------------------------------------
+    # blocking helpers (worker thread only)
+    # ------------------------------------------------------------------
+
+    def _open(self) -> None:
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(self.SCHEMA)
+        self._conn = conn
+
+    def _close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # ------------------------------------------------------------------
+    # async lifecycle
+    # ------------------------------------------------------------------
+
+    async def _open_database(self) -> None:
+        """Open (and create if needed) the database"""
+        await self._run(self._open)
+
+    async def _close_database(self) -> None:
+        """Close the connection and stop the worker thread"""
+        await self._run(self._close)
+        self._executor.shutdown(wait=False)
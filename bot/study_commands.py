@@ -6,6 +6,10 @@ import logging
 import discord
 from discord.ext import commands
 import asyncio
+from typing import Optional
+
+from bot.sarvam_client import ServiceNotice
+from bot.scheduler import Priority
 
 logger = logging.getLogger(__name__)
 
@@ -18,14 +22,17 @@ class StudyCommands(commands.Cog):
 
     # ---------- helpers ----------
 
-    async def _ask_sarvam(self, prompt: str) -> str:
+    async def _ask_sarvam(self, prompt: str, ctx: Optional[commands.Context] = None) -> str:
         """
         Send a one‑turn prompt to Sarvam and return its reply.
         Falls back to an error message on failure.
         """
         try:
             reply = await self.bot.sarvam_client.generate_response(
-                [{"role": "user", "content": prompt}]
+                [{"role": "user", "content": prompt}],
+                guild_id=ctx.guild.id if ctx and ctx.guild else None,
+                user_id=ctx.author.id if ctx else None,
+                priority=Priority.BULK,
             )
             return reply or "🤖 Sorry, no response right now."
         except Exception as exc:
@@ -59,7 +66,7 @@ class StudyCommands(commands.Cog):
         """Generate AI-powered study notes for <subject>."""
         async with ctx.typing():
             prompt = f"Write concise, high-yield study notes on '{subject}'. Use bullet points if possible."
-            reply = await self._ask_sarvam(prompt)
+            reply = await self._ask_sarvam(prompt, ctx)
         embed = discord.Embed(
             title=f"📝 Study Notes: {subject}",
             description=reply,
@@ -72,7 +79,7 @@ class StudyCommands(commands.Cog):
         """Explain code step-by-step using Sarvam AI."""
         async with ctx.typing():
             prompt = f"Explain the following code step-by-step, in simple terms.\n\n{code}"
-            reply = await self._ask_sarvam(prompt)
+            reply = await self._ask_sarvam(prompt, ctx)
         embed = discord.Embed(
             title="💻 Code Helper",
             description=reply,
@@ -88,7 +95,7 @@ class StudyCommands(commands.Cog):
             return
         async with ctx.typing():
             prompt = f"Roast {user.display_name} with a funny, light-hearted insult. Keep it safe for work."
-            reply = await self._ask_sarvam(prompt)
+            reply = await self._ask_sarvam(prompt, ctx)
         embed = discord.Embed(
             title=f"🔥 Roast for {user.display_name}",
             description=reply,
@@ -101,7 +108,7 @@ class StudyCommands(commands.Cog):
         """Explain <concept> in simple, high‑school‑level language."""
         async with ctx.typing():
             prompt = f"Explain the concept '{concept}' in clear, simple terms."
-            reply = await self._ask_sarvam(prompt)
+            reply = await self._ask_sarvam(prompt, ctx)
 
         embed = discord.Embed(
             title=f"📚 Explain: {concept}",
@@ -122,7 +129,7 @@ class StudyCommands(commands.Cog):
         value, src, dest = match.groups()
         async with ctx.typing():
             prompt = f"Convert {value} {src} to {dest}. Provide only the numeric result (rounded if sensible) followed by the unit."
-            reply = await self._ask_sarvam(prompt)
+            reply = await self._ask_sarvam(prompt, ctx)
 
         embed = discord.Embed(
             title="🔄 Unit Conversion",
@@ -139,7 +146,7 @@ class StudyCommands(commands.Cog):
                 f"List the most important formulas for '{topic}'. "
                 "Put each formula on its own bullet line."
             )
-            reply = await self._ask_sarvam(prompt)
+            reply = await self._ask_sarvam(prompt, ctx)
 
         embed = discord.Embed(
             title=f"📐 Formulas: {topic}",
@@ -156,7 +163,7 @@ class StudyCommands(commands.Cog):
             return
         async with ctx.typing():
             prompt = f"What is the meaning and origin of the name '{name}'?"
-            reply = await self._ask_sarvam(prompt)
+            reply = await self._ask_sarvam(prompt, ctx)
         embed = discord.Embed(
             title=f"🔤 Meaning of {name}",
             description=reply,
@@ -173,10 +180,22 @@ class StudyCommands(commands.Cog):
         context = self.bot._sarvam_context[-8:] if hasattr(self.bot, "_sarvam_context") else []
         context.append({"role": "user", "content": message})
         async with ctx.typing():
-            response = await self.bot.sarvam_client.generate_response(context)
+            response = await self.bot.sarvam_client.generate_response(
+                context,
+                guild_id=ctx.guild.id if ctx.guild else None,
+                user_id=ctx.author.id,
+                priority=Priority.INTERACTIVE,
+            )
+        if not response:
+            # Dropped past its deadline: keep the context free of empty turns
+            await ctx.send("🤖 Sorry, I couldn't generate a response right now.")
+            return
+        if isinstance(response, ServiceNotice):
+            await ctx.send(response)
+            return
         context.append({"role": "assistant", "content": response})
         self.bot._sarvam_context = context[-8:]  # keep only last 8 turns
-        await ctx.send(response or "🤖 Sorry, I couldn't generate a response right now.")
+        await ctx.send(response)
 
     @commands.Cog.listener()
     async def on_message(self, message):
@@ -211,7 +230,20 @@ class StudyCommands(commands.Cog):
         context.append({"role": "user", "content": message.content})
         self.bot._sarvam_context = context[-8:]
         async with message.channel.typing():
-            response = await self.bot.sarvam_client.generate_response(self.bot._sarvam_context)
+            response = await self.bot.sarvam_client.generate_response(
+                self.bot._sarvam_context,
+                guild_id=message.guild.id if message.guild else None,
+                user_id=message.author.id,
+                priority=Priority.INTERACTIVE,
+            )
+        if not response:
+            await message.channel.send(
+                "🤖 Sorry, I couldn't generate a response right now.", reference=message
+            )
+            return
+        if isinstance(response, ServiceNotice):
+            await message.channel.send(response, reference=message)
+            return
         self.bot._sarvam_context.append({"role": "assistant", "content": response})
         self.bot._sarvam_context = self.bot._sarvam_context[-8:]
         await message.channel.send(response, reference=message)
@@ -0,0 +1,37 @@
+"""
+Fast local token estimates for prompt budgeting
+"""
+
+import math
+
+# Fixed per-message cost of the chat template (role markers, separators)
+MESSAGE_OVERHEAD = 4
+
+# Roughly four characters of English/code per token; Indic and other
+# non-ASCII scripts tokenize much more densely.
+_ASCII_CHARS_PER_TOKEN = 4.0
+_OTHER_CHARS_PER_TOKEN = 1.5
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in text without a tokenizer
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Estimated token count (0 for empty text)
+    """
+    if not text:
+        return 0
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    other_chars = len(text) - ascii_chars
+    return math.ceil(
+        ascii_chars / _ASCII_CHARS_PER_TOKEN + other_chars / _OTHER_CHARS_PER_TOKEN
+    )
+
+
+def estimate_message_tokens(content: str) -> int:
+    """Estimated tokens for one chat message including template overhead"""
+    return estimate_tokens(content) + MESSAGE_OVERHEAD